@@ -2,14 +2,25 @@
 Agent Manager - Orchestrates multiple specialized API agents
 Handles intent routing, dependency resolution, and workflow coordination
 """
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable, Mapping
+from types import MappingProxyType
+from dataclasses import dataclass, field
+from collections import OrderedDict, ChainMap
 import asyncio
 import logging
+import time
 from enum import Enum
 import os
+import re
+import sys
+import weakref
+import httpx
 from dotenv import load_dotenv
 
-from .base_agent import BaseAPIAgent, APIIntent, APIResponse
+# The single .env load for the agents package - agent modules and examples rely on it
+load_dotenv()
+
+from .base_agent import BaseAPIAgent, APIIntent, APIResponse, HTTP2_AVAILABLE, aclose_shared_client
 from .city_agent import CityAgent
 from .material_agent import MaterialAgent
 from .trip_agent import TripAgent
@@ -21,9 +32,39 @@ from .consignor_selection_agent import ConsignorSelectionAgent
 from .consigner_consignee_agent import ConsignerConsigneeAgent
 from .parcel_update_agent import ParcelUpdateAgent
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Company used when the user context doesn't carry one
+_DEFAULT_COMPANY_ID = "62d66794e54f47829a886a1d"
+
+# Partner API host used directly by the manager (getUserCompany)
+_PARTNER_API_BASE_URL = "https://35.244.19.78:8042"
+
+# getUserCompany results are cached per user_id; failures expire sooner so the API is retried
+_USER_COMPANIES_TTL = 300.0
+_USER_COMPANIES_ERROR_TTL = 30.0
+_USER_COMPANIES_CACHE_SIZE = 1024
+
+# Look-ahead partner pages fetched while the user reads the current one
+_PARTNER_PAGE_TTL = 60.0
+_PARTNER_PAGE_CACHE_SIZE = 8
+
+# Formatted partner button payloads kept per (company_id, page)
+_BUTTON_DATA_CACHE_SIZE = 64
+
+# Cap on in-flight agent calls per event loop, so workflow bursts queue instead of opening sockets at once
+_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "32"))
+
+# Upper bound on client-supplied partners considered for a selection
+_MAX_SELECTABLE_PARTNERS = 50
+
+# Partner button text looks like "1. Partner Name"
+_BUTTON_PREFIX_RE = re.compile(r'^\d+\.\s')
+_BUTTON_NUMBER_RE = re.compile(r'^(\d+)\.')
+
+# Selection-flow keys forwarded unchanged from ConsignerConsigneeAgent responses
+_PASS_KEYS = ("message", "button_data", "partners", "current_step", "selection_data")
+
 class WorkflowIntent(Enum):
     """High-level workflow intents that may involve multiple agents"""
     AUTHENTICATE_USER = "authenticate_user"
@@ -38,50 +79,237 @@ class WorkflowIntent(Enum):
     CREATE_TRIP_AND_PARCEL = "create_trip_and_parcel"
     RESOLVE_DEPENDENCIES = "resolve_dependencies"
 
+async def _run_concurrently(*coros) -> List[Any]:
+    """
+    Await independent coroutines together and return their results in order
+    None entries are passed through as None results. The first failure cancels
+    the remaining coroutines and is re-raised as-is.
+    """
+    if sys.version_info >= (3, 11):
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(coro) if coro is not None else None for coro in coros]
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0]
+        return [task.result() if task is not None else None for task in tasks]
+    
+    tasks = [asyncio.ensure_future(coro) if coro is not None else None for coro in coros]
+    pending = [task for task in tasks if task is not None]
+    try:
+        await asyncio.gather(*pending)
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        raise
+    return [task.result() if task is not None else None for task in tasks]
+
+@dataclass(slots=True)
+class WorkflowTrace:
+    """Per-run workflow bookkeeping, turned into a plain dict only when it goes into an APIResponse"""
+    steps: List[str] = field(default_factory=list)
+    resolved_dependencies: Dict[str, Any] = field(default_factory=dict)
+    final_result: Any = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict view for response payloads (dataclasses.asdict would deep-copy final_result)"""
+        return {
+            "steps": self.steps,
+            "resolved_dependencies": self.resolved_dependencies,
+            "final_result": self.final_result
+        }
+
+def _resolve_company_id(data: Dict[str, Any]) -> str:
+    """Pick the company for partner lookups from the user context, falling back to the default"""
+    return (
+        data.get("current_company") or
+        data.get("company_id") or
+        data.get("created_by_company") or
+        _DEFAULT_COMPANY_ID
+    )
+
+def _extract_total(payload: Any) -> int:
+    """Read _meta.total from an API list payload, 0 when either level is missing"""
+    # The API returns an object with _meta, so index directly and only pay on the odd miss
+    try:
+        return payload["_meta"]["total"]
+    except (KeyError, TypeError, IndexError):
+        return 0
+
+def _pass_through(response_data: Mapping[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the _PASS_KEYS fields from a selection response and merge in the caller's keys"""
+    return {key: response_data.get(key) for key in _PASS_KEYS} | extra
+
+def _for_running_loop(per_loop: "weakref.WeakKeyDictionary", factory: Callable[[], Any]) -> Any:
+    """The object per_loop holds for the running event loop, created on first use there"""
+    # No await between the check and the store, so concurrent callers can't build two
+    loop = asyncio.get_running_loop()
+    value = per_loop.get(loop)
+    if value is None:
+        value = per_loop[loop] = factory()
+    return value
+
+def _build_name_index(records: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Build a lowercase name -> id lookup from cached city/material records"""
+    index = {}
+    for record in records:
+        name = record.get("name")
+        record_id = record.get("id") or record.get("_id")
+        if name and record_id:
+            index[name.strip().lower()] = record_id
+    return index
+
+@dataclass(slots=True, frozen=True)
+class PartnerOption:
+    """A partner offered for consignor selection, with its name case-folded once"""
+    id: Optional[str]
+    name: str
+    city: str
+    name_lc: str
+    
+    @classmethod
+    def from_dict(cls, partner: Dict[str, Any]) -> "PartnerOption":
+        name = partner.get("name", "")
+        return cls(
+            id=partner.get("id"),
+            name=name,
+            city=partner.get("city", "Unknown City"),
+            name_lc=name.strip().lower()
+        )
+
+def _build_partner_index(partners: Tuple[PartnerOption, ...]) -> Dict[str, Dict[str, Any]]:
+    """Build name and button-text lookups over the partners offered for selection"""
+    by_name = {}
+    by_button = {}
+    for i, partner in enumerate(partners, 1):
+        # First occurrence wins, matching the order partners were shown in
+        by_name.setdefault(partner.name_lc, partner)
+        by_button.setdefault(f"{i}. {partner.name}".strip(), (i, partner))
+    return {"by_name": by_name, "by_button": by_button}
+
 class AgentManager:
     """
     Central orchestrator for all API agents
     Routes intents, manages dependencies, and coordinates workflows
     """
     
+    # Long-lived singleton - fixed attribute layout, no per-instance __dict__
+    __slots__ = (
+        "_agent_factories", "_agent_instances", "_agents_view", "_supported_intents",
+        "_non_auth_agents", "_auth_overrides", "_shared_auth_config",
+        "_cached_cities", "_cached_materials", "_cities_locks", "_materials_locks",
+        "_city_name_index", "_material_name_index", "_city_index_source", "_material_index_source",
+        "_outbound_sems", "_user_companies_cache", "_inflight_user_companies", "_http_clients", "_basic_auth", "_basic_auth_key",
+        "_partner_page_cache", "_prefetch_tasks", "_button_data_cache"
+    )
+    
     def __init__(self):
-        self.agents: Dict[str, BaseAPIAgent] = {}
+        self._agent_factories: Dict[str, Callable[[], BaseAPIAgent]] = {}
+        self._agent_instances: Dict[str, BaseAPIAgent] = {}
+        # Read-only live view handed out by the agents property
+        self._agents_view = MappingProxyType(self._agent_instances)
+        # Intent values per agent, computed once when the agent is constructed
+        self._supported_intents: Dict[str, List[str]] = {}
+        self._non_auth_agents: List[BaseAPIAgent] = []
+        # Credential updates applied to agents constructed after login
+        self._auth_overrides: Dict[str, Any] = {}
+        # One semaphore per event loop - LangChain tools drive this singleton from worker-thread loops,
+        # and an asyncio primitive can only be waited on from the loop it is bound to
+        self._outbound_sems: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        # user_id -> (expires_at, getUserCompany result), kept in LRU order
+        self._user_companies_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # user_id -> pending getUserCompany fetch, so concurrent callers share one request
+        self._inflight_user_companies: Dict[str, asyncio.Future] = {}
+        # (company_id, page) -> (expires_at, consignor SEARCH response) for the "more" button
+        self._partner_page_cache: "OrderedDict[Tuple[str, int], Tuple[float, APIResponse]]" = OrderedDict()
+        # Strong references so background prefetches aren't garbage collected mid-flight
+        self._prefetch_tasks: set = set()
+        # (company_id, page) -> (partner ids, button payload) for the partner selection UI
+        self._button_data_cache: "OrderedDict[Tuple[str, int], Tuple[Tuple[Any, ...], Dict[str, Any]]]" = OrderedDict()
+        # Pooled clients for the manager's own API calls, one per event loop like the agents' shared client
+        self._http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._basic_auth: Optional[httpx.BasicAuth] = None
+        self._basic_auth_key: Optional[Tuple[Any, Any]] = None  # credentials _basic_auth was built from
         self._initialize_agents()
+    
+    def _get_http(self) -> httpx.AsyncClient:
+        """
+        Keep-alive client for the manager's own API calls on the running loop
+        HTTP/2 multiplexes concurrent lookups over one TLS session when h2 is installed
+        """
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                verify=False,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                http2=HTTP2_AVAILABLE
+            )
+            self._http_clients[loop] = client
+        return client
+    
+    async def warm_up(self):
+        """Open a pooled connection to the partner API so the first user request skips the TLS handshake"""
+        try:
+            await self._get_http().get(_PARTNER_API_BASE_URL, timeout=5.0)
+        except httpx.HTTPError as e:
+            logger.debug("AgentManager: Partner API warm-up failed: %s", e)
+    
+    async def aclose(self):
+        """Cancel background prefetches and close pooled HTTP clients - call on application shutdown"""
+        for task in list(self._prefetch_tasks):
+            task.cancel()
+        client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        await aclose_shared_client()
+        for agent in self._agent_instances.values():
+            aclose = getattr(agent, "aclose", None)
+            if aclose is not None:
+                await aclose()
+    
+    @property
+    def agents(self) -> Mapping[str, BaseAPIAgent]:
+        """Read-only view of agents constructed so far - agents are created lazily by get_agent()"""
+        return self._agents_view
         
     def _initialize_agents(self):
-        """Initialize all specialized agents with configuration"""
-        # Get authentication config (will be updated after login)
-        auth_config = {
+        """Register factories for all specialized agents with configuration"""
+        # Shared authentication config (will be updated after login)
+        # Passed by reference so a single write reaches every agent using it
+        self._shared_auth_config = {
             "username": os.getenv("PARCEL_API_USERNAME"),
             "password": os.getenv("PARCEL_API_PASSWORD"),
             "token": None  # Will be set after authentication
         }
+        auth_config = self._shared_auth_config
+        factories = self._agent_factories
         
-        # Initialize Authentication Agent first
+        # Authentication Agent
         auth_api_url = os.getenv("AUTH_API_URL", "https://35.244.19.78:8042")
-        self.agents["auth"] = AuthAgent(base_url=auth_api_url)
+        factories["auth"] = lambda: AuthAgent(base_url=auth_api_url)
         
-        # Initialize City Agent
+        # City Agent
         cities_api_url = os.getenv("GET_CITIES_API_URL")
         if cities_api_url:
-            self.agents["city"] = CityAgent(
+            factories["city"] = lambda: CityAgent(
                 base_url=cities_api_url,
                 auth_config=auth_config
             )
         
-        # Initialize Material Agent
+        # Material Agent
         materials_api_url = os.getenv("GET_MATERIALS_API_URL")
         if materials_api_url:
-            self.agents["material"] = MaterialAgent(
+            factories["material"] = lambda: MaterialAgent(
                 base_url=materials_api_url,
                 auth_config=auth_config,
                 default_material_id=os.getenv("DEFAULT_MATERIAL_ID")
             )
         
-        # Initialize Trip Agent
+        # Trip Agent
         trips_api_url = os.getenv("TRIP_API_URL")
         if trips_api_url:
-            self.agents["trip"] = TripAgent(
+            factories["trip"] = lambda: TripAgent(
                 base_url=trips_api_url,
                 auth_config=auth_config,
                 handled_by=os.getenv("CREATED_BY_ID"),
@@ -90,77 +318,177 @@ class AgentManager:
                 default_trip_id=os.getenv("TRIP_ID")
             )
         
-        # Initialize Parcel Agent
+        # Parcel Agent
         parcels_api_url = os.getenv("PARCEL_API_URL")
         if parcels_api_url:
-            self.agents["parcel"] = ParcelAgent(
+            factories["parcel"] = lambda: ParcelAgent(
                 base_url=parcels_api_url,
                 auth_config=auth_config,
                 created_by=os.getenv("CREATED_BY_ID"),
                 created_by_company=os.getenv("CREATED_BY_COMPANY_ID")
             )
         
-        # Initialize new specialized agents for trip and parcel creation
-        self.agents["trip_creator"] = TripCreationAgent()
-        self.agents["parcel_creator"] = ParcelCreationAgent()
-        self.agents["consignor_selector"] = ConsignorSelectionAgent()
-        self.agents["consigner_consignee"] = ConsignerConsigneeAgent()
-        self.agents["parcel_updater"] = ParcelUpdateAgent()
+        # Specialized agents for trip and parcel creation
+        factories["trip_creator"] = TripCreationAgent
+        factories["parcel_creator"] = ParcelCreationAgent
+        factories["consignor_selector"] = ConsignorSelectionAgent
+        factories["consigner_consignee"] = ConsignerConsigneeAgent
+        factories["parcel_updater"] = ParcelUpdateAgent
         
         # Initialize cache for cities and materials data
         self._cached_cities = []
         self._cached_materials = []
         
-        logger.info(f"AgentManager: Initialized {len(self.agents)} agents: {list(self.agents.keys())}")
+        # Guards so a cold cache is filled by a single LIST request - one lock per event loop, like _outbound_sems
+        self._cities_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        self._materials_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        
+        # Name -> id indexes over the cached lists, built on first lookup
+        self._city_name_index: Dict[str, str] = {}
+        self._material_name_index: Dict[str, str] = {}
+        self._city_index_source = None
+        self._material_index_source = None
+        
+        logger.info(f"AgentManager: Registered {len(factories)} agents: {list(factories.keys())}")
+    
+    def _rebuild_non_auth(self):
+        """
+        Rebuild the list of agents that receive credentials (all except auth agent)
+        Agents sharing _shared_auth_config are skipped - they are updated by a single write
+        """
+        self._non_auth_agents = [
+            agent for name, agent in self._agent_instances.items()
+            if name != "auth" and agent.auth_config is not self._shared_auth_config
+        ]
     
     def set_auth_token(self, token: str):
         """Set authentication token for all agents (except auth agent)"""
-        for name, agent in self.agents.items():
-            if name != "auth":  # Skip auth agent
-                agent.auth_config["token"] = token
+        self._shared_auth_config["token"] = token
+        self._auth_overrides["token"] = token
+        for agent in self._non_auth_agents:
+            agent.auth_config["token"] = token
         logger.info("AgentManager: Updated auth token for all agents")
     
     def set_basic_auth_for_all_agents(self, username: str, password: str):
         """Set basic auth credentials for all agents (except auth agent)"""
-        for name, agent in self.agents.items():
-            if name != "auth":  # Skip auth agent
-                agent.auth_config["username"] = username
-                agent.auth_config["password"] = password
+        self._shared_auth_config["username"] = username
+        self._shared_auth_config["password"] = password
+        self._auth_overrides["username"] = username
+        self._auth_overrides["password"] = password
+        for agent in self._non_auth_agents:
+            agent.auth_config["username"] = username
+            agent.auth_config["password"] = password
         logger.info("AgentManager: Updated basic auth credentials for all agents")
     
+    def has_agent(self, agent_name: str) -> bool:
+        """Check if an agent is configured, without constructing it"""
+        return agent_name in self._agent_factories
+    
     def get_agent(self, agent_name: str) -> Optional[BaseAPIAgent]:
-        """Get specific agent by name"""
-        return self.agents.get(agent_name)
+        """Get specific agent by name, constructing it on first use"""
+        if agent_name in self._agent_instances:
+            return self._agent_instances[agent_name]
+        
+        factory = self._agent_factories.get(agent_name)
+        if factory is None:
+            return None
+        
+        agent = factory()
+        if agent_name != "auth" and agent.auth_config is not self._shared_auth_config:
+            agent.auth_config.update(self._auth_overrides)
+        self._agent_instances[agent_name] = agent
+        self._supported_intents[agent_name] = [intent.value for intent in agent.get_supported_intents()]
+        self._rebuild_non_auth()
+        logger.info(f"AgentManager: Initialized agent '{agent_name}'")
+        return agent
     
     async def execute_single_intent(self, agent_name: str, intent: APIIntent, 
                                   data: Dict[str, Any]) -> APIResponse:
         """Execute a single intent on a specific agent"""
         agent = self.get_agent(agent_name)
-        if not agent:
+        if agent is None:
             return APIResponse(
                 success=False,
                 error=f"Agent '{agent_name}' not found or not configured",
                 agent_name="AgentManager"
             )
         
+        # Cache hits are answered synchronously, without queueing behind the outbound semaphore
+        cached_response = agent.execute_cached(intent, data)
+        if cached_response is not None:
+            return cached_response
+        
+        intent_value = intent.value
+        execute = agent.execute
         try:
-            response = await agent.execute(intent, data)
-            logger.info(f"AgentManager: {agent_name} {intent.value} - Success: {response.success}")
+            async with _for_running_loop(self._outbound_sems, lambda: asyncio.Semaphore(_MAX_CONCURRENCY)):
+                response = await execute(intent, data)
+            logger.info("AgentManager: %s %s - Success: %s", agent_name, intent_value, response.success)
             return response
         except Exception as e:
-            logger.error(f"AgentManager: Error executing {agent_name} {intent.value}: {str(e)}")
+            logger.error("AgentManager: Error executing %s %s: %s", agent_name, intent_value, e)
             return APIResponse(
                 success=False,
                 error=str(e),
                 agent_name=agent_name,
-                intent=intent.value
+                intent=intent_value
             )
     
+    def _get_city_name_index(self) -> Dict[str, str]:
+        """Name -> id index over _cached_cities, rebuilt whenever the cached list is replaced"""
+        if self._city_index_source is not self._cached_cities:
+            self._city_name_index = _build_name_index(self._cached_cities)
+            self._city_index_source = self._cached_cities
+        return self._city_name_index
+    
+    def _get_material_name_index(self) -> Dict[str, str]:
+        """Name -> id index over _cached_materials, rebuilt whenever the cached list is replaced"""
+        if self._material_index_source is not self._cached_materials:
+            self._material_name_index = _build_name_index(self._cached_materials)
+            self._material_index_source = self._cached_materials
+        return self._material_name_index
+    
+    async def _get_cities(self) -> List[Dict[str, Any]]:
+        """
+        Return cached cities, fetching them once if the cache is cold
+        Concurrent callers wait on the same LIST request instead of issuing their own
+        """
+        if self._cached_cities or not self.has_agent("city"):
+            return self._cached_cities
+        
+        async with _for_running_loop(self._cities_locks, asyncio.Lock):
+            if not self._cached_cities:
+                cities_response = await self.execute_single_intent("city", APIIntent.LIST, {})
+                if cities_response.success and cities_response.data:
+                    self._cached_cities = cities_response.data.get('cities', [])
+        return self._cached_cities
+    
+    async def _get_materials(self) -> List[Dict[str, Any]]:
+        """
+        Return cached materials, fetching them once if the cache is cold
+        Concurrent callers wait on the same LIST request instead of issuing their own
+        """
+        if self._cached_materials or not self.has_agent("material"):
+            return self._cached_materials
+        
+        async with _for_running_loop(self._materials_locks, asyncio.Lock):
+            if not self._cached_materials:
+                materials_response = await self.execute_single_intent("material", APIIntent.LIST, {})
+                if materials_response.success and materials_response.data:
+                    self._cached_materials = materials_response.data.get('materials', [])
+        return self._cached_materials
+    
     async def resolve_city_id(self, city_name: str) -> Optional[str]:
-        """Resolve city name to city ID"""
-        if "city" not in self.agents:
+        """Resolve city name to city ID (in-memory index first, API on miss)"""
+        if not isinstance(city_name, str) or not city_name.strip() or not self.has_agent("city"):
             return None
         
+        city_index = self._get_city_name_index()
+        key = city_name.strip().lower()
+        hit = city_index.get(key)
+        if hit:
+            return hit
+        
         response = await self.execute_single_intent(
             "city", APIIntent.SEARCH, {"city_name": city_name}
         )
@@ -168,15 +496,24 @@ class AgentManager:
         if response.success and response.data:
             cities = response.data.get("cities", [])
             if cities:
+                # SEARCH is a prefix match - only an exact name belongs in the name index
+                if response.data.get("match_type") == "exact":
+                    city_index[key] = cities[0]["id"]
                 return cities[0]["id"]
         
         return None
     
     async def resolve_material_id(self, material_name: str) -> Optional[str]:
-        """Resolve material name to material ID"""
-        if "material" not in self.agents:
+        """Resolve material name to material ID (in-memory index first, API on miss)"""
+        if not isinstance(material_name, str) or not material_name.strip() or not self.has_agent("material"):
             return None
         
+        material_index = self._get_material_name_index()
+        key = material_name.strip().lower()
+        hit = material_index.get(key)
+        if hit:
+            return hit
+        
         response = await self.execute_single_intent(
             "material", APIIntent.SEARCH, {"material_name": material_name}
         )
@@ -184,16 +521,19 @@ class AgentManager:
         if response.success and response.data:
             materials = response.data.get("materials", [])
             if materials:
+                # Partial matches are suggestions - only an exact name belongs in the name index
+                if response.data.get("match_type") == "exact":
+                    material_index[key] = materials[0]["id"]
                 return materials[0]["id"]
         
         return None
     
     async def create_or_get_trip(self, from_city_id: str = None, to_city_id: str = None) -> Optional[str]:
         """Create a new trip or get existing trip for route"""
-        if "trip" not in self.agents:
+        if not self.has_agent("trip"):
             return None
         
-        trip_agent = self.agents["trip"]
+        trip_agent = self.get_agent("trip")
         
         if from_city_id and to_city_id:
             # Try to get existing trip for route
@@ -242,76 +582,77 @@ class AgentManager:
         Complete parcel creation workflow with dependency resolution
         Steps:
         1. Resolve from/to cities to IDs
-        2. Resolve material name to ID
-        3. Create or get trip
+        2. Create or get trip (as soon as both cities are resolved)
+        3. Resolve material name to ID (concurrently with steps 1-2)
         4. Create parcel
         """
         logger.info("AgentManager: Starting CREATE_PARCEL workflow")
-        workflow_results = {
-            "steps": [],
-            "resolved_dependencies": {},
-            "final_result": None
-        }
+        # Human-readable step trace is only recorded when the caller asks for it
+        verbose = data.get("_trace", False)
+        trace = WorkflowTrace()
         
         try:
-            # Step 1: Resolve from city
             from_city_name = data.get("from_city")
-            if from_city_name:
-                from_city_id = await self.resolve_city_id(from_city_name)
+            to_city_name = data.get("to_city")
+            material_name = data.get("material")
+            
+            async def resolve_route_and_trip() -> Tuple[Optional[str], Optional[str], Optional[str]]:
+                # Step 1: Resolve from/to cities concurrently
+                from_city_id, to_city_id = await _run_concurrently(
+                    self.resolve_city_id(from_city_name) if from_city_name else None,
+                    self.resolve_city_id(to_city_name) if to_city_name else None
+                )
                 if from_city_id:
                     data["from_city_id"] = from_city_id
-                    workflow_results["resolved_dependencies"]["from_city"] = {
-                        "name": from_city_name,
-                        "id": from_city_id
-                    }
-                    workflow_results["steps"].append(f"✓ Resolved from city: {from_city_name} → {from_city_id}")
-                else:
-                    workflow_results["steps"].append(f"⚠ Could not resolve from city: {from_city_name}")
-            
-            # Step 2: Resolve to city
-            to_city_name = data.get("to_city")
-            if to_city_name:
-                to_city_id = await self.resolve_city_id(to_city_name)
                 if to_city_id:
                     data["to_city_id"] = to_city_id
-                    workflow_results["resolved_dependencies"]["to_city"] = {
-                        "name": to_city_name,
-                        "id": to_city_id
-                    }
-                    workflow_results["steps"].append(f"✓ Resolved to city: {to_city_name} → {to_city_id}")
-                else:
-                    workflow_results["steps"].append(f"⚠ Could not resolve to city: {to_city_name}")
+                
+                # Step 2: Trip only depends on the city IDs - it overlaps the material lookup
+                trip_id = await self.create_or_get_trip(
+                    data.get("from_city_id"), 
+                    data.get("to_city_id")
+                )
+                return from_city_id, to_city_id, trip_id
             
-            # Step 3: Resolve material
-            material_name = data.get("material")
-            if material_name:
-                material_id = await self.resolve_material_id(material_name)
-                if material_id:
-                    data["material_id"] = material_id
-                    workflow_results["resolved_dependencies"]["material"] = {
-                        "name": material_name,
-                        "id": material_id
+            # Steps 1-3: route + trip and material run side by side; a failure cancels the other
+            (from_city_id, to_city_id, trip_id), material_id = await _run_concurrently(
+                resolve_route_and_trip(),
+                self.resolve_material_id(material_name) if material_name else None
+            )
+            
+            for dep_field, name, resolved_id in (
+                ("from_city", from_city_name, from_city_id),
+                ("to_city", to_city_name, to_city_id),
+                ("material", material_name, material_id)
+            ):
+                if not name:
+                    continue
+                if resolved_id:
+                    trace.resolved_dependencies[dep_field] = {
+                        "name": name,
+                        "id": resolved_id
                     }
-                    workflow_results["steps"].append(f"✓ Resolved material: {material_name} → {material_id}")
-                else:
-                    workflow_results["steps"].append(f"⚠ Could not resolve material: {material_name}")
+                    if verbose:
+                        trace.steps.append(f"✓ Resolved {dep_field.replace('_', ' ')}: {name} → {resolved_id}")
+                elif verbose:
+                    trace.steps.append(f"⚠ Could not resolve {dep_field.replace('_', ' ')}: {name}")
+            
+            if material_id:
+                data["material_id"] = material_id
             
-            # Step 4: Create or get trip
-            trip_id = await self.create_or_get_trip(
-                data.get("from_city_id"), 
-                data.get("to_city_id")
-            )
             if trip_id:
                 data["trip_id"] = trip_id
-                workflow_results["resolved_dependencies"]["trip"] = {"id": trip_id}
-                workflow_results["steps"].append(f"✓ Created/retrieved trip: {trip_id}")
+                trace.resolved_dependencies["trip"] = {"id": trip_id}
+                if verbose:
+                    trace.steps.append(f"✓ Created/retrieved trip: {trip_id}")
             else:
-                workflow_results["steps"].append("⚠ Could not create/retrieve trip")
+                if verbose:
+                    trace.steps.append("⚠ Could not create/retrieve trip")
                 return APIResponse(
                     success=False,
                     error="Failed to create or retrieve trip - required for parcel creation",
                     agent_name="AgentManager",
-                    data=workflow_results
+                    data=trace.to_dict()
                 )
             
             # Step 5: Create parcel
@@ -320,35 +661,38 @@ class AgentManager:
             )
             
             if parcel_response.success:
-                workflow_results["steps"].append("✓ Parcel created successfully")
-                workflow_results["final_result"] = parcel_response.data
+                if verbose:
+                    trace.steps.append("✓ Parcel created successfully")
+                trace.final_result = parcel_response.data
                 
                 return APIResponse(
                     success=True,
                     data={
                         "workflow": "CREATE_PARCEL",
                         "parcel_result": parcel_response.data,
-                        "workflow_details": workflow_results
+                        "workflow_details": trace.to_dict()
                     },
                     agent_name="AgentManager"
                 )
             else:
-                workflow_results["steps"].append(f"✗ Parcel creation failed: {parcel_response.error}")
+                if verbose:
+                    trace.steps.append(f"✗ Parcel creation failed: {parcel_response.error}")
                 return APIResponse(
                     success=False,
                     error=f"Parcel creation failed: {parcel_response.error}",
                     agent_name="AgentManager",
-                    data=workflow_results
+                    data=trace.to_dict()
                 )
         
         except Exception as e:
             logger.error(f"AgentManager: CREATE_PARCEL workflow error: {str(e)}")
-            workflow_results["steps"].append(f"✗ Workflow error: {str(e)}")
+            if verbose:
+                trace.steps.append(f"✗ Workflow error: {str(e)}")
             return APIResponse(
                 success=False,
                 error=str(e),
                 agent_name="AgentManager",
-                data=workflow_results
+                data=trace.to_dict()
             )
     
     async def _workflow_search_cities(self, data: Dict[str, Any]) -> APIResponse:
@@ -382,33 +726,32 @@ class AgentManager:
     
     async def _workflow_resolve_dependencies(self, data: Dict[str, Any]) -> APIResponse:
         """Resolve all dependencies without creating anything"""
+        verbose = data.get("_trace", False)
         workflow_results = {
             "resolved_dependencies": {},
             "steps": []
         }
         
-        # Resolve cities
-        for city_field in ["from_city", "to_city", "city_name"]:
-            if city_field in data:
-                city_name = data[city_field]
-                city_id = await self.resolve_city_id(city_name)
-                if city_id:
-                    workflow_results["resolved_dependencies"][city_field] = {
-                        "name": city_name,
-                        "id": city_id
-                    }
-                    workflow_results["steps"].append(f"✓ Resolved {city_field}: {city_name} → {city_id}")
-        
-        # Resolve materials
+        # Collect every lookup up front so they resolve concurrently
+        lookups = [
+            (city_field, data[city_field], self.resolve_city_id(data[city_field]))
+            for city_field in ["from_city", "to_city", "city_name"]
+            if city_field in data
+        ]
         if "material" in data or "material_name" in data:
             material_name = data.get("material") or data.get("material_name")
-            material_id = await self.resolve_material_id(material_name)
-            if material_id:
-                workflow_results["resolved_dependencies"]["material"] = {
-                    "name": material_name,
-                    "id": material_id
+            lookups.append(("material", material_name, self.resolve_material_id(material_name)))
+        
+        resolved_ids = await asyncio.gather(*(coro for _, _, coro in lookups))
+        
+        for (field, name, _), resolved_id in zip(lookups, resolved_ids):
+            if resolved_id:
+                workflow_results["resolved_dependencies"][field] = {
+                    "name": name,
+                    "id": resolved_id
                 }
-                workflow_results["steps"].append(f"✓ Resolved material: {material_name} → {material_id}")
+                if verbose:
+                    workflow_results["steps"].append(f"✓ Resolved {field}: {name} → {resolved_id}")
         
         return APIResponse(
             success=True,
@@ -420,32 +763,49 @@ class AgentManager:
         """Initialize cache for all agents"""
         logger.info("AgentManager: Initializing cache for all agents...")
         
+        # City and material lists are worth constructing their agents for
+        for agent_name in ("city", "material"):
+            self.get_agent(agent_name)
+        
         tasks = []
-        for agent_name, agent in self.agents.items():
+        task_agents = []
+        for agent_name, agent in self._agent_instances.items():
             if hasattr(agent, 'initialize_cache'):
                 tasks.append(agent.initialize_cache())
+                task_agents.append(agent_name)
             elif agent_name in ["city", "material"]:
                 # For city and material agents, fetch initial data to populate cache
                 tasks.append(agent.execute(APIIntent.LIST, {}))
+                task_agents.append(agent_name)
         
         if tasks:
             results = await asyncio.gather(*tasks, return_exceptions=True)
             successful = sum(1 for r in results if not isinstance(r, Exception))
+            
+            # Keep the LIST results so resolvers can answer from memory
+            for agent_name, result in zip(task_agents, results):
+                if not isinstance(result, APIResponse) or not result.success or not result.data:
+                    continue
+                if agent_name == "city":
+                    self._cached_cities = result.data.get("cities", [])
+                elif agent_name == "material":
+                    self._cached_materials = result.data.get("materials", [])
             logger.info(f"AgentManager: Cache initialization completed. {successful}/{len(tasks)} successful")
     
     def get_agent_status(self) -> Dict[str, Any]:
-        """Get status of all agents"""
+        """Get status of all configured agents (details only for constructed ones)"""
         status = {
-            "total_agents": len(self.agents),
+            "total_agents": len(self._agent_factories),
+            "initialized_agents": len(self._agent_instances),
             "agents": {}
         }
         
-        for name, agent in self.agents.items():
+        for name, agent in self._agent_instances.items():
             status["agents"][name] = {
                 "name": agent.name,
                 "base_url": agent.base_url,
                 "cache_size": len(agent.cache),
-                "supported_intents": [intent.value for intent in agent.get_supported_intents()]
+                "supported_intents": self._supported_intents[name]
             }
         
         return status
@@ -460,7 +820,7 @@ class AgentManager:
         """
         logger.info("AgentManager: Starting AUTHENTICATE_USER workflow")
         
-        if "auth" not in self.agents:
+        if not self.has_agent("auth"):
             return APIResponse(
                 success=False,
                 error="Authentication agent not available",
@@ -545,6 +905,37 @@ class AgentManager:
         else:
             return False, None, response.error
     
+    def _build_user_context(self, data: Mapping[str, Any], purpose: str = "") -> Tuple[Optional[Dict[str, Any]], Optional[APIResponse]]:
+        """
+        Build the user context passed to the trip/parcel creation agents
+        Returns: (user_context, None) on success or (None, error_response) if user_id is missing
+        """
+        # Ensure we have the required user_id from localStorage
+        user_id = data.get("user_id")
+        if not user_id:
+            return None, APIResponse(
+                success=False,
+                error=f"user_id is required from localStorage authentication data{purpose}",
+                agent_name="AgentManager"
+            )
+        
+        # Use current_company from data or fall back to the static default
+        current_company = data.get("current_company") or _DEFAULT_COMPANY_ID
+        name = data.get("name", "User")
+        
+        return {
+            "user_id": user_id,
+            "username": data.get("username", ""),
+            "name": name,
+            "email": data.get("email", ""),
+            "current_company": current_company,
+            "user_record": data.get("user_record"),
+            # Legacy field mappings for older code
+            "company_id": current_company,
+            "user_name": name,
+            "handled_by": user_id  # handled_by is same as created_by (user_id)
+        }, None
+    
     async def _workflow_create_trip_advanced(self, data: Dict[str, Any]) -> APIResponse:
         """
         Advanced trip creation workflow using the new TripCreationAgent
@@ -552,7 +943,8 @@ class AgentManager:
         """
         logger.info("AgentManager: Starting CREATE_TRIP_ADVANCED workflow")
         
-        if "trip_creator" not in self.agents:
+        trip_creator = self.get_agent("trip_creator")
+        if trip_creator is None:
             return APIResponse(
                 success=False,
                 error="Trip creation agent not available",
@@ -560,37 +952,12 @@ class AgentManager:
             )
         
         try:
-            trip_creator = self.agents["trip_creator"]
-            
             # Extract user context for trip creation from localStorage data
-            user_id = data.get("user_id")
-            # Use static current_company or fall back to data
-            current_company = data.get("current_company", "62d66794e54f47829a886a1d")
+            user_context, error_response = self._build_user_context(data, purpose=" for trip creation")
+            if error_response:
+                return error_response
             
-            if not user_id:
-                return APIResponse(
-                    success=False,
-                    error="user_id is required from localStorage authentication data for trip creation",
-                    agent_name="AgentManager"
-                )
-            
-            # Ensure current_company is always set
-            if not current_company:
-                current_company = "62d66794e54f47829a886a1d"
-            
-            user_context = {
-                "user_id": user_id,
-                "current_company": current_company,
-                "name": data.get("name", "User"),
-                "email": data.get("email", ""),
-                "username": data.get("username", ""),
-                "user_record": data.get("user_record"),
-                # Legacy field mappings
-                "company_id": current_company,
-                "handled_by": user_id  # handled_by is same as created_by (user_id)
-            }
-            
-            print(f"AgentManager: user_context for trip creation: {user_context}")
+            logger.debug("AgentManager: user_context for trip_creation: %s", user_context)
             
             # Use natural language processing to create trip
             response = await trip_creator.handle_trip_creation_request(
@@ -599,7 +966,7 @@ class AgentManager:
             )
             
             if response.success:
-                logger.info(f"AgentManager: Trip created successfully with ID: {response.data.get('trip_id')}")
+                logger.info("AgentManager: Trip created successfully with ID: %s", response.data.get('trip_id'))
                 return APIResponse(
                     success=True,
                     data={
@@ -625,13 +992,13 @@ class AgentManager:
                 agent_name="AgentManager"
             )
     
-    async def _workflow_create_parcel_for_trip(self, data: Dict[str, Any]) -> APIResponse:
+    async def _workflow_create_parcel_for_trip(self, data: Mapping[str, Any]) -> APIResponse:
         """
         Create parcel for existing trip workflow using ParcelCreationAgent
         """
         logger.info("AgentManager: Starting CREATE_PARCEL_FOR_TRIP workflow")
         
-        if "parcel_creator" not in self.agents:
+        if not self.has_agent("parcel_creator"):
             return APIResponse(
                 success=False,
                 error="Parcel creation agent not available",
@@ -647,53 +1014,19 @@ class AgentManager:
             )
         
         try:
-            parcel_creator = self.agents["parcel_creator"]
+            parcel_creator = self.get_agent("parcel_creator")
             
             # Pass through all user context data from the workflow
-            # Ensure we have the required user_id from localStorage
-            user_id = data.get("user_id")
-            if not user_id:
-                return APIResponse(
-                    success=False,
-                    error="user_id is required from localStorage authentication data",
-                    agent_name="AgentManager"
-                )
-            
-            # Use static current_company or fall back to data
-            current_company = data.get("current_company", "62d66794e54f47829a886a1d")
-            if not current_company:
-                current_company = "62d66794e54f47829a886a1d"
-            
-            user_context = {
-                "user_id": user_id,
-                "username": data.get("username", ""),
-                "name": data.get("name", "User"),
-                "email": data.get("email", ""),
-                "current_company": current_company,
-                "user_record": data.get("user_record"),
-                # Legacy fallbacks for older code
-                "company_id": current_company,
-                "user_name": data.get("name", "User")
-            }
+            user_context, error_response = self._build_user_context(data)
+            if error_response:
+                return error_response
             
-            print(f"AgentManager: user_context for parcel creation: {user_context}")
+            logger.debug("AgentManager: user_context for parcel_creation: %s", user_context)
             
             # Get cached cities and materials data, or fetch if not available
-            cities_data = getattr(self, '_cached_cities', [])
-            materials_data = getattr(self, '_cached_materials', [])
-            
-            # If no cached data, try to fetch it synchronously
-            if not cities_data and "city" in self.agents:
-                cities_response = await self.execute_single_intent("city", APIIntent.LIST, {})
-                if cities_response.success and cities_response.data:
-                    cities_data = cities_response.data.get('cities', [])
-                    self._cached_cities = cities_data
-            
-            if not materials_data and "material" in self.agents:
-                materials_response = await self.execute_single_intent("material", APIIntent.LIST, {})
-                if materials_response.success and materials_response.data:
-                    materials_data = materials_response.data.get('materials', [])
-                    self._cached_materials = materials_data
+            cities_data, materials_data = await asyncio.gather(
+                self._get_cities(), self._get_materials()
+            )
             
             response = await parcel_creator.handle_parcel_creation_request(
                 user_message=data.get("message", "Create a parcel"),
@@ -710,47 +1043,36 @@ class AgentManager:
             )
             
             if response.success:
-                logger.info(f"AgentManager: Parcel created successfully with ID: {response.data.get('parcel_id')}")
+                logger.info("AgentManager: Parcel created successfully with ID: %s", response.data.get('parcel_id'))
 
                 # Trigger NEW consigner/consignee selection after successful parcel creation
                 parcel_id = response.data.get('parcel_id')
                 parcel_etag = response.data.get('parcel_etag')  # Get _etag from parcel creation
 
                 # Pass _etag through the data for consigner/consignee flow
-                enhanced_data = data.copy()
-                enhanced_data['parcel_etag'] = parcel_etag
+                enhanced_data = ChainMap({'parcel_etag': parcel_etag}, data)
 
                 consigner_response = await self._trigger_consigner_consignee_flow(enhanced_data, trip_id, parcel_id)
                 
                 if consigner_response.success:
                     logger.info("AgentManager: Consigner/Consignee selection initiated")
                     
-                    # Get the formatted message with partner options and button data
-                    formatted_partners = consigner_response.data.get("message", "")
-                    button_data = consigner_response.data.get("button_data", {})
-                    
                     # Create comprehensive message with parcel success + consigner selection
+                    formatted_partners = consigner_response.data.get("message", "")
                     full_message = f"{response.data.get('message')}\n\n{formatted_partners}"
                     
                     return APIResponse(
                         success=True,
-                        data={
-                            "workflow": "CREATE_PARCEL_FOR_TRIP",
-                            "parcel_result": response.data,
-                            "consigner_selection": consigner_response.data,
-                            "message": full_message,
-                            "button_data": button_data,
-                            "available_partners": consigner_response.data.get("partners", []),
-                            "current_page": 0,
-                            "requires_user_input": True,
-                            "input_type": "consigner_selection",
-                            "partner_buttons": button_data.get("buttons", []),
-                            "action_buttons": button_data.get("action_buttons", [])
-                        },
+                        data=self._build_partner_selection_payload(
+                            consigner_response.data,
+                            workflow="CREATE_PARCEL_FOR_TRIP",
+                            parcel_result=response.data,
+                            message=full_message
+                        ),
                         agent_name="AgentManager"
                     )
                 else:
-                    logger.warning(f"AgentManager: Consigner selection failed: {consigner_response.error}")
+                    logger.warning("AgentManager: Consigner selection failed: %s", consigner_response.error)
                     # Still return success for parcel creation even if consigner selection fails
                     return APIResponse(
                         success=True,
@@ -816,8 +1138,8 @@ class AgentManager:
             workflow_results["trip_result"] = trip_response.data.get("trip_result")
             
             # Step 2: Create parcel for the trip
-            parcel_data = data.copy()
-            parcel_data["trip_id"] = trip_id
+            # Overlay trip_id on the caller's data - reads fall through, nothing is copied
+            parcel_data = ChainMap({"trip_id": trip_id}, data)
             
             parcel_response = await self._workflow_create_parcel_for_trip(parcel_data)
             
@@ -825,47 +1147,42 @@ class AgentManager:
                 workflow_results["steps"].append("✓ Parcel created successfully")
                 workflow_results["parcel_result"] = parcel_response.data.get("parcel_result")
 
-                # Step 3: Trigger NEW consigner/consignee selection after successful parcel creation
+                # Step 3: _workflow_create_parcel_for_trip already triggered the consigner/consignee
+                # selection - reuse its result instead of a second round trip
                 parcel_id = workflow_results["parcel_result"].get("parcel_id")
-                parcel_etag = workflow_results["parcel_result"].get("parcel_etag")  # Get _etag from parcel creation
-
-                # Pass _etag through the data for consigner/consignee flow
-                enhanced_data = data.copy()
-                enhanced_data['parcel_etag'] = parcel_etag
-
-                consigner_response = await self._trigger_consigner_consignee_flow(enhanced_data, trip_id, parcel_id)
+                consigner_selection = parcel_response.data.get("consigner_selection")
                 
-                if consigner_response.success:
+                if not consigner_selection:
+                    # The inner attempt failed gracefully - retry it once here
+                    retry_data = ChainMap({"parcel_etag": workflow_results["parcel_result"].get("parcel_etag")}, data)
+                    consigner_response = await self._trigger_consigner_consignee_flow(retry_data, trip_id, parcel_id)
+                    if consigner_response.success:
+                        consigner_selection = consigner_response.data
+                    else:
+                        logger.warning("AgentManager: Consigner selection retry failed: %s", consigner_response.error)
+                
+                if consigner_selection:
                     workflow_results["steps"].append("✓ Consigner selection initiated")
-                    workflow_results["consigner_selection"] = consigner_response.data
+                    workflow_results["consigner_selection"] = consigner_selection
                     
-                    # Get the formatted message and button data
-                    formatted_partners = consigner_response.data.get("message", "")
-                    button_data = consigner_response.data.get("button_data", {})
+                    formatted_partners = consigner_selection.get("message", "")
                     success_message = f"Successfully created trip ({trip_id}) and parcel ({parcel_id}).\n\n{formatted_partners}"
                     
                     return APIResponse(
                         success=True,
-                        data={
-                            "workflow": "CREATE_TRIP_AND_PARCEL",
-                            "trip_id": trip_id,
-                            "parcel_id": parcel_id,
-                            "workflow_details": workflow_results,
-                            "consigner_selection": workflow_results.get("consigner_selection"),
-                            "message": success_message,
-                            "button_data": button_data,
-                            "available_partners": consigner_response.data.get("partners", []),
-                            "current_page": 0,
-                            "company_id": data.get("current_company"),
-                            "requires_user_input": True,
-                            "input_type": "consigner_selection",
-                            "partner_buttons": button_data.get("buttons", []),
-                            "action_buttons": button_data.get("action_buttons", [])
-                        },
+                        data=self._build_partner_selection_payload(
+                            consigner_selection,
+                            workflow="CREATE_TRIP_AND_PARCEL",
+                            trip_id=trip_id,
+                            parcel_id=parcel_id,
+                            workflow_details=workflow_results,
+                            message=success_message,
+                            company_id=data.get("current_company")
+                        ),
                         agent_name="AgentManager"
                     )
                 else:
-                    workflow_results["steps"].append(f"⚠ Consigner selection failed: {consigner_response.error}")
+                    workflow_results["steps"].append("⚠ Consigner selection failed")
                     
                     return APIResponse(
                         success=True,
@@ -898,13 +1215,31 @@ class AgentManager:
                 data=workflow_results
             )
     
-    async def _trigger_consigner_consignee_flow(self, data: Dict[str, Any], trip_id: str, parcel_id: str) -> APIResponse:
+    def _build_partner_selection_payload(self, consigner_data: Dict[str, Any], **extras) -> Dict[str, Any]:
+        """
+        Response payload asking the user to pick a consigner, shared by the parcel workflows
+        extras carries the workflow-specific keys (workflow, message, ids, ...)
+        """
+        button_data = consigner_data.get("button_data", {})
+        return {
+            **extras,
+            "consigner_selection": consigner_data,
+            "button_data": button_data,
+            "available_partners": consigner_data.get("partners", []),
+            "current_page": 0,
+            "requires_user_input": True,
+            "input_type": "consigner_selection",
+            "partner_buttons": button_data.get("buttons", []),
+            "action_buttons": button_data.get("action_buttons", [])
+        }
+    
+    async def _trigger_consigner_consignee_flow(self, data: Mapping[str, Any], trip_id: str, parcel_id: str) -> APIResponse:
         """
         Trigger the NEW consigner/consignee selection flow (shows ONLY consigner first)
         """
         logger.info("AgentManager: Triggering NEW consigner/consignee selection flow")
         
-        if "consigner_consignee" not in self.agents:
+        if not self.has_agent("consigner_consignee"):
             return APIResponse(
                 success=False,
                 error="ConsignerConsigneeAgent not available",
@@ -913,15 +1248,10 @@ class AgentManager:
         
         try:
             # Get company ID from user context
-            company_id = (
-                data.get("current_company") or 
-                data.get("company_id") or 
-                data.get("created_by_company") or
-                "62d66794e54f47829a886a1d"
-            )
+            company_id = _resolve_company_id(data)
             
-            print(f"AgentManager: Starting consigner/consignee flow for company: {company_id}")
-            print(f"AgentManager: Trip ID: {trip_id}, Parcel ID: {parcel_id}")
+            logger.debug("AgentManager: Starting consigner/consignee flow for company: %s", company_id)
+            logger.debug("AgentManager: Trip ID: %s, Parcel ID: %s", trip_id, parcel_id)
             
             # Initialize the NEW consigner/consignee selection process
             flow_data = {
@@ -962,7 +1292,8 @@ class AgentManager:
         """
         logger.info("AgentManager: Triggering consignor selection workflow")
         
-        if "consignor_selector" not in self.agents:
+        consignor_agent = self.get_agent("consignor_selector")
+        if consignor_agent is None:
             return APIResponse(
                 success=False,
                 error="Consignor selection agent not available",
@@ -970,18 +1301,11 @@ class AgentManager:
             )
         
         try:
-            consignor_agent = self.agents["consignor_selector"]
-            
             # Get company ID from user context - try multiple fields
-            company_id = (
-                data.get("current_company") or 
-                data.get("company_id") or 
-                data.get("created_by_company") or
-                "62d66794e54f47829a886a1d"
-            )
+            company_id = _resolve_company_id(data)
             
-            print(f"AgentManager: Triggering consignor selection for company: {company_id}")
-            print(f"AgentManager: Available user context keys: {list(data.keys())}")
+            logger.debug("AgentManager: Triggering consignor selection for company: %s", company_id)
+            logger.debug("AgentManager: Available user context keys: %s", list(data))
             
             # Get preferred partners (first page, 5 items)
             consignor_data = {
@@ -998,17 +1322,22 @@ class AgentManager:
                 partners = response.data.get("partners", [])
                 
                 if partners:
+                    # Warm the getUserCompany cache while the user picks a partner
+                    self._schedule_user_companies_prefetch(partners)
+                    
                     # Format partners for display with button format
                     formatted_message = consignor_agent.format_partners_for_chat(
                         partners, 
                         response.data.get("page", 0)
                     )
                     
-                    # Create button data for frontend
-                    button_data = consignor_agent.format_partners_as_buttons(
+                    # Create button data for frontend - reused while the page's partners are unchanged
+                    button_data = dict(self._get_partner_button_data(
+                        consignor_agent,
+                        company_id,
                         partners,
                         response.data.get("page", 0)
-                    )
+                    ))
                     button_data["has_more"] = response.data.get("has_more", False)
                     
                     return APIResponse(
@@ -1063,7 +1392,8 @@ class AgentManager:
         """
         logger.info("AgentManager: Handling consignor selection")
         
-        if "consignor_selector" not in self.agents:
+        consignor_agent = self.get_agent("consignor_selector")
+        if consignor_agent is None:
             return APIResponse(
                 success=False,
                 error="Consignor selection agent not available",
@@ -1071,168 +1401,185 @@ class AgentManager:
             )
         
         try:
-            consignor_agent = self.agents["consignor_selector"]
-            
             # Check if user wants to see more partners
             user_input = data.get("selection", "").lower().strip()
-            
-            if user_input == "more":
-                # Get next page of partners
-                page = data.get("current_page", 0) + 1
-                company_id = data.get("company_id", "62d66794e54f47829a886a1d")
-                
-                consignor_data = {
-                    "company_id": company_id,
-                    "page": page,
-                    "page_size": 5
-                }
-                
-                response = await consignor_agent.execute(APIIntent.SEARCH, consignor_data)
-                
-                if response.success and response.data:
-                    partners = response.data.get("partners", [])
-                    formatted_message = consignor_agent.format_partners_for_chat(partners, page)
+            # Name/button lookups built once and shared by the selection checks below
+            # These run inline on the event loop (too cheap for an executor hop), so the
+            # client-supplied list is capped to keep them short
+            available_partners = tuple(
+                PartnerOption.from_dict(partner)
+                for partner in data.get("available_partners", [])[:_MAX_SELECTABLE_PARTNERS]
+            )
+            partner_index = _build_partner_index(available_partners)
+            
+            selected_partner = None
+            match user_input:
+                case "more":
+                    # Get next page of partners
+                    page = data.get("current_page", 0) + 1
+                    company_id = data.get("company_id", _DEFAULT_COMPANY_ID)
+                    
+                    response = self._pop_prefetched_partner_page(company_id, page)
+                    if response is None:
+                        consignor_data = {
+                            "company_id": company_id,
+                            "page": page,
+                            "page_size": 5
+                        }
+                        response = await consignor_agent.execute(APIIntent.SEARCH, consignor_data)
                     
+                    if response.success and response.data:
+                        if response.data.get("has_more", False):
+                            self._schedule_partner_prefetch(company_id, page + 1)
+                        partners = response.data.get("partners", [])
+                        self._schedule_user_companies_prefetch(partners)
+                        formatted_message = consignor_agent.format_partners_for_chat(partners, page)
+                        
+                        return APIResponse(
+                            success=True,
+                            data={
+                                "action": "show_more_partners",
+                                "partners": partners,
+                                "formatted_message": formatted_message,
+                                "has_more": response.data.get("has_more", False),
+                                "page": page
+                            },
+                            agent_name="AgentManager"
+                        )
+                    return APIResponse(
+                        success=False,
+                        error=f"Failed to fetch more partners: {response.error}",
+                        agent_name="AgentManager"
+                    )
+                
+                case "skip":
+                    # User chose to skip consignor selection
                     return APIResponse(
                         success=True,
                         data={
-                            "action": "show_more_partners",
-                            "partners": partners,
-                            "formatted_message": formatted_message,
-                            "has_more": response.data.get("has_more", False),
-                            "page": page
+                            "action": "skip_consignor",
+                            "message": "Consignor selection skipped. Your trip and parcel are ready!"
                         },
                         agent_name="AgentManager"
                     )
-                    
-            elif user_input == "skip":
-                # User chose to skip consignor selection
-                return APIResponse(
-                    success=True,
-                    data={
-                        "action": "skip_consignor",
-                        "message": "Consignor selection skipped. Your trip and parcel are ready!"
-                    },
-                    agent_name="AgentManager"
-                )
                 
-            elif user_input.isdigit() or self._is_button_selection(user_input, data.get("available_partners", [])) or self._is_partner_name_selection(user_input, data.get("available_partners", [])):
                 # User selected a partner by number, button text, or direct name
-                available_partners = data.get("available_partners", [])
-                selected_partner = None
-                
-                if user_input.isdigit():
-                    selection_number = int(user_input)
+                # Arms are tried in order, so the cheap digit check runs before any lookup
+                case digits if digits.isdigit():
+                    selection_number = int(digits)
                     if 1 <= selection_number <= len(available_partners):
                         selected_partner = available_partners[selection_number - 1]
-                elif self._is_button_selection(user_input, available_partners):
+                
+                case button_text if self._is_button_selection(button_text, partner_index):
                     # Extract number from button text like "1. Partner Name"
-                    selection_number = self._extract_number_from_button_text(user_input)
+                    selection_number = self._extract_number_from_button_text(button_text)
                     if selection_number and 1 <= selection_number <= len(available_partners):
                         selected_partner = available_partners[selection_number - 1]
-                else:
+                
+                case partner_name_input:
                     # Direct partner name selection
-                    selected_partner = self._find_partner_by_name(user_input, available_partners)
+                    selected_partner = self._find_partner_by_name(partner_name_input, partner_index)
+                    if selected_partner is None:
+                        return APIResponse(
+                            success=False,
+                            error="Invalid input. Please enter a number (1-5), 'more' for more options, or 'skip' to continue.",
+                            agent_name="AgentManager"
+                        )
+            
+            if selected_partner:
+                partner_name = selected_partner.name
+                partner_id = selected_partner.id
+                partner_city = selected_partner.city
                 
-                if selected_partner:
-                    partner_name = selected_partner["name"]
-                    partner_id = selected_partner.get("id")
-                    partner_city = selected_partner.get("city", "Unknown City")
-                    
-                    # Call getUserCompany API for the selected partner
-                    user_companies_response = await self._call_get_user_companies_api(partner_id)
-                    
-                    trip_id = data.get("trip_id", "")
-                    parcel_id = data.get("parcel_id", "")
+                # Call getUserCompany API for the selected partner
+                user_companies_response = await self._call_get_user_companies_api(partner_id)
+                
+                trip_id = data.get("trip_id", "")
+                parcel_id = data.get("parcel_id", "")
+                
+                if user_companies_response.get("success"):
+                    companies_data = user_companies_response.get("companies", [])
                     
-                    if user_companies_response.get("success"):
-                        companies_data = user_companies_response.get("companies", [])
-                        
-                        # Check if partner has multiple companies - if so, show company selection
-                        if len(companies_data) > 1:
-                            # Multiple companies - user needs to select one
-                            if "user_company" in self.agents:
-                                user_company_agent = self.agents["user_company"]
-                                formatted_companies = user_company_agent.format_companies_for_selection(companies_data)
-                                company_buttons = user_company_agent.format_companies_as_buttons(companies_data)
-                                
-                                return APIResponse(
-                                    success=True,
-                                    data={
-                                        "action": "company_selection_required",
-                                        "step": "company_selection",
-                                        "selected_partner": {
-                                            "id": partner_id,
-                                            "name": partner_name,
-                                            "city": partner_city
-                                        },
-                                        "companies": companies_data,
-                                        "formatted_message": f"**Partner Selected:** {partner_name}\n\n{formatted_companies}",
-                                        "button_data": company_buttons,
-                                        "trip_id": trip_id,
-                                        "parcel_id": parcel_id,
-                                        "requires_user_input": True,
-                                        "input_type": "company_selection"
+                    # Check if partner has multiple companies - if so, show company selection
+                    if len(companies_data) > 1:
+                        # Multiple companies - user needs to select one
+                        if self.has_agent("user_company"):
+                            user_company_agent = self.get_agent("user_company")
+                            formatted_companies = user_company_agent.format_companies_for_selection(companies_data)
+                            company_buttons = user_company_agent.format_companies_as_buttons(companies_data)
+                            
+                            return APIResponse(
+                                success=True,
+                                data={
+                                    "action": "company_selection_required",
+                                    "step": "company_selection",
+                                    "selected_partner": {
+                                        "id": partner_id,
+                                        "name": partner_name,
+                                        "city": partner_city
                                     },
-                                    agent_name="AgentManager"
-                                )
-                        
-                        # Single company or no companies - proceed with selection
-                        selected_company = companies_data[0] if companies_data else None
-                        companies_info = f"\n**Partner Company:** {selected_company.get('name', 'N/A')}" if selected_company else "\n**Partner Companies:** No companies found"
-                    else:
-                        companies_data = []
-                        selected_company = None
-                        companies_info = f"\n**Partner Companies:** Error fetching companies - {user_companies_response.get('error', 'Unknown error')}"
-                    
-                    # Create confirmation message
-                    confirmation_message = f"✅ **Partner Selected Successfully**\n\n"
-                    confirmation_message += f"**Selected Partner:** {partner_name}\n"
-                    confirmation_message += f"**Location:** {partner_city}\n"
-                    confirmation_message += f"**Partner ID:** {partner_id}\n"
-                    confirmation_message += companies_info
-                    
-                    if parcel_id:
-                        confirmation_message += f"\n\n📦 **Parcel ID:** {parcel_id}"
-                    if trip_id:
-                        confirmation_message += f"\n🚛 **Trip ID:** {trip_id}"
-                    
-                    confirmation_message += f"\n\n🎉 Your parcel is now linked with {partner_name}!"
-                    
-                    # Update consignor selection
-                    response = await consignor_agent.execute(APIIntent.UPDATE, {
-                        "partner_id": partner_id,
-                        "partner_name": partner_name
-                    })
+                                    "companies": companies_data,
+                                    "formatted_message": f"**Partner Selected:** {partner_name}\n\n{formatted_companies}",
+                                    "button_data": company_buttons,
+                                    "trip_id": trip_id,
+                                    "parcel_id": parcel_id,
+                                    "requires_user_input": True,
+                                    "input_type": "company_selection"
+                                },
+                                agent_name="AgentManager"
+                            )
                     
-                    return APIResponse(
-                        success=True,
-                        data={
-                            "action": "consignor_selected",
-                            "selected_partner": {
-                                "id": partner_id,
-                                "name": partner_name,
-                                "city": partner_city,
-                                "companies": companies_data,
-                                "selected_company": selected_company
-                            },
-                            "message": confirmation_message,
-                            "trip_id": trip_id,
-                            "parcel_id": parcel_id,
-                            "user_companies_response": user_companies_response
-                        },
-                        agent_name="AgentManager"
-                    )
+                    # Single company or no companies - proceed with selection
+                    selected_company = companies_data[0] if companies_data else None
+                    companies_info = f"\n**Partner Company:** {selected_company.get('name', 'N/A')}" if selected_company else "\n**Partner Companies:** No companies found"
                 else:
-                    return APIResponse(
-                        success=False,
-                        error=f"Invalid selection. Please enter a number between 1 and {len(available_partners)}, 'more' for more options, or 'skip' to continue.",
-                        agent_name="AgentManager"
-                    )
+                    companies_data = []
+                    selected_company = None
+                    companies_info = f"\n**Partner Companies:** Error fetching companies - {user_companies_response.get('error', 'Unknown error')}"
+                
+                # Create confirmation message - collected as parts and joined once
+                message_parts = [
+                    "✅ **Partner Selected Successfully**\n\n",
+                    f"**Selected Partner:** {partner_name}\n",
+                    f"**Location:** {partner_city}\n",
+                    f"**Partner ID:** {partner_id}\n",
+                    companies_info
+                ]
+                if parcel_id:
+                    message_parts.append(f"\n\n📦 **Parcel ID:** {parcel_id}")
+                if trip_id:
+                    message_parts.append(f"\n🚛 **Trip ID:** {trip_id}")
+                message_parts.append(f"\n\n🎉 Your parcel is now linked with {partner_name}!")
+                confirmation_message = "".join(message_parts)
+                
+                # Update consignor selection
+                response = await consignor_agent.execute(APIIntent.UPDATE, {
+                    "partner_id": partner_id,
+                    "partner_name": partner_name
+                })
+                
+                return APIResponse(
+                    success=True,
+                    data={
+                        "action": "consignor_selected",
+                        "selected_partner": {
+                            "id": partner_id,
+                            "name": partner_name,
+                            "city": partner_city,
+                            "companies": companies_data,
+                            "selected_company": selected_company
+                        },
+                        "message": confirmation_message,
+                        "trip_id": trip_id,
+                        "parcel_id": parcel_id,
+                        "user_companies_response": user_companies_response
+                    },
+                    agent_name="AgentManager"
+                )
             else:
                 return APIResponse(
                     success=False,
-                    error="Invalid input. Please enter a number (1-5), 'more' for more options, or 'skip' to continue.",
+                    error=f"Invalid selection. Please enter a number between 1 and {len(available_partners)}, 'more' for more options, or 'skip' to continue.",
                     agent_name="AgentManager"
                 )
                 
@@ -1244,76 +1591,183 @@ class AgentManager:
                 agent_name="AgentManager"
             )
     
+    def _get_partner_button_data(self, consignor_agent, company_id: str,
+                                 partners: List[Dict[str, Any]], page: int) -> Dict[str, Any]:
+        """
+        Button payload for a partner page, cached per (company_id, page)
+        The entry is rebuilt when the page's partner ids change; callers copy before adding keys
+        """
+        key = (company_id, page)
+        partner_ids = tuple(partner.get("id") for partner in partners)
+        cache = self._button_data_cache
+        cached = cache.get(key)
+        if cached is not None and cached[0] == partner_ids:
+            cache.move_to_end(key)
+            return cached[1]
+        
+        button_data = consignor_agent.format_partners_as_buttons(partners, page)
+        cache[key] = (partner_ids, button_data)
+        cache.move_to_end(key)
+        if len(cache) > _BUTTON_DATA_CACHE_SIZE:
+            cache.popitem(last=False)
+        return button_data
+    
+    def _pop_prefetched_partner_page(self, company_id: str, page: int) -> Optional[APIResponse]:
+        """Take a prefetched partner page out of the look-ahead cache if it's still fresh"""
+        cached = self._partner_page_cache.pop((company_id, page), None)
+        if cached is None:
+            return None
+        expires_at, response = cached
+        return response if time.monotonic() < expires_at else None
+    
+    def _schedule_partner_prefetch(self, company_id: str, page: int):
+        """Fetch the next partner page in the background so the next "more" is served from cache"""
+        if (company_id, page) in self._partner_page_cache:
+            return
+        task = asyncio.create_task(self._prefetch_partner_page(company_id, page))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+    
+    def _schedule_user_companies_prefetch(self, partners: List[Dict[str, Any]]):
+        """
+        Speculatively fetch getUserCompany for the partners on screen
+        Results land in the TTL cache, and a pick made mid-fetch joins the in-flight request
+        """
+        for partner in partners[:5]:
+            partner_id = partner.get("id")
+            if not partner_id or partner_id in self._user_companies_cache or partner_id in self._inflight_user_companies:
+                continue
+            task = asyncio.create_task(self._call_get_user_companies_api(partner_id))
+            self._prefetch_tasks.add(task)
+            task.add_done_callback(self._prefetch_tasks.discard)
+    
+    async def _prefetch_partner_page(self, company_id: str, page: int):
+        """Background SEARCH for one partner page, stored only on success"""
+        try:
+            response = await self.execute_single_intent("consignor_selector", APIIntent.SEARCH, {
+                "company_id": company_id,
+                "page": page,
+                "page_size": 5
+            })
+        except Exception as e:
+            logger.debug("AgentManager: Partner page prefetch failed for page %s: %s", page, e)
+            return
+        if not (response.success and response.data):
+            return
+        
+        cache = self._partner_page_cache
+        cache[(company_id, page)] = (time.monotonic() + _PARTNER_PAGE_TTL, response)
+        cache.move_to_end((company_id, page))
+        if len(cache) > _PARTNER_PAGE_CACHE_SIZE:
+            cache.popitem(last=False)
+    
     async def _call_get_user_companies_api(self, user_id: str) -> Dict[str, Any]:
         """
         Call the getUserCompany API for the selected partner
+        Results are served from a TTL/LRU cache keyed by user_id, and concurrent
+        calls for the same user_id share a single in-flight request
+        """
+        cache = self._user_companies_cache
+        now = time.monotonic()
+        cached = cache.get(user_id)
+        if cached is not None:
+            expires_at, result = cached
+            if now < expires_at:
+                cache.move_to_end(user_id)
+                return result
+            del cache[user_id]
+        
+        loop = asyncio.get_running_loop()
+        # A fetch owned by another thread's loop can't be awaited here - only join our own
+        while (inflight := self._inflight_user_companies.get(user_id)) is not None and inflight.get_loop() is loop:
+            # Shielded so a cancelled waiter doesn't cancel the shared fetch
+            shared = await asyncio.shield(inflight)
+            if shared is not None:
+                return shared
+            # None - the owning fetch (e.g. a dropped prefetch) was cancelled; join or start another
+        
+        future = loop.create_future()
+        self._inflight_user_companies[user_id] = future
+        try:
+            result = await self._fetch_user_companies(user_id)
+        except BaseException:
+            # Cancelling the owner must not cancel its waiters - they retry on their own
+            future.set_result(None)
+            raise
+        finally:
+            if self._inflight_user_companies.get(user_id) is future:
+                del self._inflight_user_companies[user_id]
+        future.set_result(result)
+        
+        ttl = _USER_COMPANIES_TTL if result.get("success") else _USER_COMPANIES_ERROR_TTL
+        cache[user_id] = (time.monotonic() + ttl, result)
+        cache.move_to_end(user_id)
+        if len(cache) > _USER_COMPANIES_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+    
+    async def _fetch_user_companies(self, user_id: str) -> Dict[str, Any]:
+        """
+        Fetch companies for a user from the getUserCompany API (uncached)
         """
         try:
-            import httpx
-            
             # Build the API URL
-            api_url = f"https://35.244.19.78:8042/get_user_companies"
+            api_url = f"{_PARTNER_API_BASE_URL}/get_user_companies"
             params = {"user_id": user_id}
             
-            print(f"AgentManager: Calling getUserCompany API for user_id: {user_id}")
-            print(f"AgentManager: API URL: {api_url}")
+            logger.debug("AgentManager: Calling getUserCompany API for user_id: %s", user_id)
+            logger.debug("AgentManager: API URL: %s", api_url)
             
-            async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-                # Use Basic Auth
-                auth = (self.agents["consignor_selector"].auth_config["username"], 
-                       self.agents["consignor_selector"].auth_config["password"])
-                
-                response = await client.get(api_url, params=params, auth=auth)
+            # Use Basic Auth from the consignor selector's credentials - rebuilt only when they change
+            auth_config = self.get_agent("consignor_selector").auth_config
+            auth_key = (auth_config["username"], auth_config["password"])
+            if auth_key != self._basic_auth_key:
+                self._basic_auth = httpx.BasicAuth(*auth_key)
+                self._basic_auth_key = auth_key
+            
+            response = await self._get_http().get(api_url, params=params, auth=self._basic_auth)
+            
+            logger.debug("AgentManager: getUserCompany API status: %s", response.status_code)
+            
+            if response.status_code == 200:
+                data = response.json()
+                logger.debug("AgentManager: getUserCompany API success: found companies")
                 
-                print(f"AgentManager: getUserCompany API status: {response.status_code}")
+                return {
+                    "success": True,
+                    "companies": data.get("companies", []),
+                    "total": _extract_total(data),
+                    "raw_response": data
+                }
+            else:
+                error_text = response.text
+                logger.warning("AgentManager: getUserCompany API error: %s", error_text)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    print(f"AgentManager: getUserCompany API success: found companies")
-                    
-                    return {
-                        "success": True,
-                        "companies": data.get("companies", []),
-                        "total": data.get("_meta", {}).get("total", 0) if isinstance(data, dict) else 0,
-                        "raw_response": data
-                    }
-                else:
-                    error_text = response.text
-                    print(f"AgentManager: getUserCompany API error: {error_text}")
-                    
-                    return {
-                        "success": False,
-                        "error": f"API call failed with status {response.status_code}: {error_text}",
-                        "status_code": response.status_code
-                    }
+                return {
+                    "success": False,
+                    "error": f"API call failed with status {response.status_code}: {error_text}",
+                    "status_code": response.status_code
+                }
                     
         except Exception as e:
-            print(f"AgentManager: Exception calling getUserCompany API: {str(e)}")
+            logger.error("AgentManager: Exception calling getUserCompany API: %s", e)
             return {
                 "success": False,
                 "error": f"Exception calling getUserCompany API: {str(e)}"
             }
 
-    def _is_button_selection(self, user_input: str, available_partners: List[Dict]) -> bool:
+    def _is_button_selection(self, user_input: str, partner_index: Dict[str, Dict[str, Any]]) -> bool:
         """Check if user input matches a button text format"""
         # Check if it matches pattern like "1. Partner Name"
-        import re
-        pattern = r'^\d+\.\s'
-        if re.match(pattern, user_input):
+        if _BUTTON_PREFIX_RE.match(user_input):
             return True
         
         # Check if it matches any partner button text
-        for i, partner in enumerate(available_partners, 1):
-            button_text = f"{i}. {partner['name']}"
-            if user_input.strip() == button_text.strip():
-                return True
-        
-        return False
+        return user_input.strip() in partner_index["by_button"]
 
     def _extract_number_from_button_text(self, button_text: str) -> int:
         """Extract number from button text like '1. Partner Name'"""
-        import re
-        match = re.match(r'^(\d+)\.', button_text.strip())
+        match = _BUTTON_NUMBER_RE.match(button_text.strip())
         if match:
             return int(match.group(1))
         
@@ -1321,27 +1775,9 @@ class AgentManager:
         # This is handled in the calling method
         return 0
 
-    def _is_partner_name_selection(self, user_input: str, available_partners: List[Dict]) -> bool:
-        """Check if user input matches a partner name"""
-        user_input_clean = user_input.strip().lower()
-        
-        for partner in available_partners:
-            partner_name = partner.get('name', '').strip().lower()
-            if user_input_clean == partner_name:
-                return True
-        
-        return False
-
-    def _find_partner_by_name(self, user_input: str, available_partners: List[Dict]) -> Dict:
+    def _find_partner_by_name(self, user_input: str, partner_index: Dict[str, Dict[str, Any]]) -> Optional[PartnerOption]:
         """Find partner by exact name match"""
-        user_input_clean = user_input.strip().lower()
-        
-        for partner in available_partners:
-            partner_name = partner.get('name', '').strip().lower()
-            if user_input_clean == partner_name:
-                return partner
-        
-        return None
+        return partner_index["by_name"].get(user_input.strip().lower())
     
     async def start_consigner_consignee_flow(self, data: Dict[str, Any]) -> APIResponse:
         """
@@ -1349,7 +1785,8 @@ class AgentManager:
         """
         logger.info("AgentManager: Starting consigner/consignee selection flow")
         
-        if "consigner_consignee" not in self.agents:
+        consigner_consignee_agent = self.get_agent("consigner_consignee")
+        if consigner_consignee_agent is None:
             return APIResponse(
                 success=False,
                 error="ConsignerConsigneeAgent not available",
@@ -1357,14 +1794,8 @@ class AgentManager:
             )
         
         try:
-            consigner_consignee_agent = self.agents["consigner_consignee"]
-            
             # Get company ID from user context
-            company_id = (
-                data.get("current_company") or 
-                data.get("company_id") or 
-                "62d66794e54f47829a886a1d"
-            )
+            company_id = _resolve_company_id(data)
             
             # Initialize the selection process
             init_data = {
@@ -1385,20 +1816,11 @@ class AgentManager:
             
             if response.success:
                 # The response already contains formatted message and button data from initialization
-                return APIResponse(
-                    success=True,
-                    data={
-                        "workflow": "CONSIGNER_CONSIGNEE_SELECTION",
-                        "message": response.data.get("message"),
-                        "button_data": response.data.get("button_data"),
-                        "partners": response.data.get("partners"),
-                        "current_step": response.data.get("current_step"),
-                        "selection_data": response.data.get("selection_data"),
-                        "requires_user_input": True,
-                        "input_type": "consigner_selection"
-                    },
-                    agent_name="AgentManager"
-                )
+                return self._wrap_selection_step(response.data or {}, {
+                    "workflow": "CONSIGNER_CONSIGNEE_SELECTION",
+                    "requires_user_input": True,
+                    "input_type": "consigner_selection"
+                })
             else:
                 return response
                 
@@ -1410,13 +1832,23 @@ class AgentManager:
                 agent_name="AgentManager"
             )
     
+    @staticmethod
+    def _wrap_selection_step(response_data: Mapping[str, Any], extra: Dict[str, Any]) -> APIResponse:
+        """Wrap a ConsignerConsigneeAgent step that still needs user input - shared by flow start and selection"""
+        return APIResponse(
+            success=True,
+            data=_pass_through(response_data, extra),
+            agent_name="AgentManager"
+        )
+    
     async def handle_consigner_consignee_selection(self, data: Dict[str, Any]) -> APIResponse:
         """
         Handle selection in the consigner/consignee flow
         """
         logger.info("AgentManager: Handling consigner/consignee selection")
         
-        if "consigner_consignee" not in self.agents:
+        consigner_consignee_agent = self.get_agent("consigner_consignee")
+        if consigner_consignee_agent is None:
             return APIResponse(
                 success=False,
                 error="ConsignerConsigneeAgent not available",
@@ -1424,54 +1856,33 @@ class AgentManager:
             )
         
         try:
-            consigner_consignee_agent = self.agents["consigner_consignee"]
-            
             # Handle the selection
             response = await consigner_consignee_agent.execute(APIIntent.UPDATE, data)
             
             if response.success:
-                action = response.data.get("action")
+                # Bound once - every branch below reads from the same payload
+                response_data = response.data or {}
+                action = response_data.get("action")
                 
                 if action == "consigner_selected":
                     # Consigner selected, response already contains formatted consignee selection message
-                    return APIResponse(
-                        success=True,
-                        data={
-                            "action": "consigner_selected",
-                            "message": response.data.get("message"),
-                            "button_data": response.data.get("button_data"),
-                            "partners": response.data.get("partners"),
-                            "current_step": response.data.get("current_step"),
-                            "selection_data": response.data.get("selection_data"),
-                            "selected_consigner": response.data.get("selected_consigner"),
-                            "requires_user_input": True,
-                            "input_type": "consignee_selection"
-                        },
-                        agent_name="AgentManager"
-                    )
+                    return self._wrap_selection_step(response_data, {
+                        "action": "consigner_selected",
+                        "selected_consigner": response_data.get("selected_consigner"),
+                        "requires_user_input": True,
+                        "input_type": "consignee_selection"
+                    })
                 
                 elif action == "consignee_selected":
                     # Both selections complete - now update the parcel
-                    final_data = response.data.get("final_data")
+                    final_data = response_data.get("final_data") or {}
                     parcel_id = final_data.get("parcel_id")
 
-                    # COMPREHENSIVE LOGGING - Both selections stored in backend
-                    print(f"AgentManager: ==========================================")
-                    print(f"AgentManager: BOTH SELECTIONS STORED - TRIGGERING UPDATE")
-                    print(f"AgentManager: ==========================================")
-                    print(f"AgentManager: ✅ Consigner stored: {final_data.get('consigner_details', {}).get('name')}")
-                    print(f"AgentManager: ✅ Consignee stored: {final_data.get('consignee_details', {}).get('name')}")
-                    print(f"AgentManager: → Parcel ID: {parcel_id}")
-                    print(f"AgentManager: → Trip ID: {final_data.get('trip_id')}")
-                    print(f"AgentManager: → Stored _etag: {final_data.get('parcel_etag')}")
-                    print(f"AgentManager: → API Endpoint: /preferred_partners (same for both)")
-                    print(f"AgentManager: → Next Action: Executing ParcelUpdateAgent")
-                    print(f"AgentManager: ==========================================")
-
-                    if parcel_id and "parcel_updater" in self.agents:
-                        # Log the automatic trigger
-                        print(f"AgentManager: 🚀 AUTOMATIC TRIGGER: ConsignerConsigneeAgent → ParcelUpdateAgent")
+                    # Both selections stored in backend
+                    logger.debug("AgentManager: Both selections stored - parcel=%s trip=%s etag=%s",
+                                 parcel_id, final_data.get('trip_id'), final_data.get('parcel_etag'))
 
+                    if parcel_id and self.has_agent("parcel_updater"):
                         # Automatically update the parcel with consigner/consignee details
                         update_response = await self._update_parcel_with_selections(final_data, data)
                         
@@ -1484,7 +1895,7 @@ class AgentManager:
                                     "final_data": final_data,
                                     "update_result": update_response.data,
                                     "parcel_id": parcel_id,
-                                    "selection_data": response.data.get("selection_data"),
+                                    "selection_data": response_data.get("selection_data"),
                                     "requires_user_input": False,
                                     "workflow_complete": True
                                 },
@@ -1496,10 +1907,10 @@ class AgentManager:
                                 success=True,
                                 data={
                                     "action": "selection_complete_update_failed",
-                                    "message": f"{response.data.get('message')}\n\n⚠️ **Warning:** Parcel update failed: {update_response.error}",
+                                    "message": f"{response_data.get('message')}\n\n⚠️ **Warning:** Parcel update failed: {update_response.error}",
                                     "final_data": final_data,
                                     "api_payload": final_data.get("api_payload"),
-                                    "selection_data": response.data.get("selection_data"),
+                                    "selection_data": response_data.get("selection_data"),
                                     "update_error": update_response.error,
                                     "requires_user_input": False,
                                     "ready_for_manual_api": True
@@ -1512,10 +1923,10 @@ class AgentManager:
                             success=True,
                             data={
                                 "action": "selection_complete",
-                                "message": response.data.get("message"),
+                                "message": response_data.get("message"),
                                 "final_data": final_data,
                                 "api_payload": final_data.get("api_payload"),
-                                "selection_data": response.data.get("selection_data"),
+                                "selection_data": response_data.get("selection_data"),
                                 "requires_user_input": False,
                                 "ready_for_api": True
                             },
@@ -1540,7 +1951,7 @@ class AgentManager:
         logger.info("AgentManager: Updating parcel with consigner/consignee selections")
         
         try:
-            parcel_updater = self.agents["parcel_updater"]
+            parcel_updater = self.get_agent("parcel_updater")
             parcel_id = final_data.get("parcel_id")
             
             if not parcel_id:
@@ -1564,32 +1975,17 @@ class AgentManager:
                     if key in original_data:
                         update_data[key] = original_data[key]
             
-            print(f"AgentManager: ========================================")
-            print(f"AgentManager: AUTOMATIC CHAIN EXECUTION")
-            print(f"AgentManager: ConsignerConsigneeAgent → ParcelUpdateAgent")
-            print(f"AgentManager: ========================================")
-            print(f"AgentManager: ConsignerConsigneeAgent completed successfully")
-            print(f"AgentManager: → Consigner selected: {final_data.get('consigner_details', {}).get('name')}")
-            print(f"AgentManager: → Consignee selected: {final_data.get('consignee_details', {}).get('name')}")
-            print(f"AgentManager: → Parcel ID: {parcel_id}")
-            print(f"AgentManager: → Trip ID: {final_data.get('trip_id')}")
-            print(f"AgentManager: Now executing ParcelUpdateAgent with PATCH API...")
+            logger.debug("AgentManager: Chain ConsignerConsignee -> ParcelUpdate parcel=%s trip=%s",
+                         parcel_id, final_data.get('trip_id'))
             
             # Execute the parcel update via ParcelUpdateAgent
             response = await parcel_updater.execute(APIIntent.CREATE, update_data)
             
             if response.success:
-                print(f"AgentManager: ✅ ParcelUpdateAgent execution SUCCESS!")
-                print(f"AgentManager: → PATCH API completed successfully")
-                print(f"AgentManager: → Parcel {parcel_id} updated with all consigner/consignee details")
-                print(f"AgentManager: ========================================")
-                logger.info(f"AgentManager: CHAIN COMPLETE: ConsignerConsigneeAgent → ParcelUpdateAgent → SUCCESS")
+                logger.info("AgentManager: CHAIN COMPLETE: ConsignerConsigneeAgent → ParcelUpdateAgent → SUCCESS (parcel %s)", parcel_id)
                 return response
             else:
-                print(f"AgentManager: ❌ ParcelUpdateAgent execution FAILED!")
-                print(f"AgentManager: → Error: {response.error}")
-                print(f"AgentManager: ========================================")
-                logger.error(f"AgentManager: CHAIN FAILED: ConsignerConsigneeAgent → ParcelUpdateAgent → ERROR: {response.error}")
+                logger.error("AgentManager: CHAIN FAILED: ConsignerConsigneeAgent → ParcelUpdateAgent → ERROR: %s", response.error)
                 return response
                 
         except Exception as e:
@@ -1606,7 +2002,8 @@ class AgentManager:
         """
         logger.info("AgentManager: Direct parcel update requested")
         
-        if "parcel_updater" not in self.agents:
+        parcel_updater = self.get_agent("parcel_updater")
+        if parcel_updater is None:
             return APIResponse(
                 success=False,
                 error="ParcelUpdateAgent not available",
@@ -1614,8 +2011,6 @@ class AgentManager:
             )
         
         try:
-            parcel_updater = self.agents["parcel_updater"]
-            
             # Determine the intent based on data structure
             if "update_payload" in data:
                 # Direct update with payload
@@ -1660,18 +2055,19 @@ class AgentManager:
             # Find the selected company
             selected_company = None
             
-            # Try to match by company name
-            for company in companies:
-                if user_selection.lower() == company.get("name", "").lower():
-                    selected_company = company
-                    break
-            
-            # If not found by name, try by index if it's a number
-            if not selected_company and user_selection.isdigit():
+            # Numbered menu picks are the common case - resolve them without any string work
+            if user_selection.isdigit():
                 selection_index = int(user_selection) - 1
                 if 0 <= selection_index < len(companies):
                     selected_company = companies[selection_index]
             
+            # Otherwise match by company name - names are case-folded once into a lookup (first match wins)
+            if not selected_company:
+                companies_by_name = {}
+                for company in companies:
+                    companies_by_name.setdefault(company.get("name", "").lower(), company)
+                selected_company = companies_by_name.get(user_selection.lower())
+            
             if not selected_company:
                 return APIResponse(
                     success=False,
@@ -1700,8 +2096,8 @@ class AgentManager:
             confirmation_message += f"\n\n🎉 Your parcel is now linked with {partner_name} ({company_name})!"
             
             # Update consignor selection
-            if "consignor_selector" in self.agents:
-                consignor_agent = self.agents["consignor_selector"]
+            consignor_agent = self.get_agent("consignor_selector")
+            if consignor_agent is not None:
                 await consignor_agent.execute(APIIntent.UPDATE, {
                     "partner_id": partner_id,
                     "partner_name": partner_name
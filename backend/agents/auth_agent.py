@@ -3,10 +3,15 @@ Authentication Agent - Handles login and authentication operations
 Purpose: Authenticate users and provide tokens for other agents
 """
 from typing import Dict, Any, List, Optional, Tuple
-import json
 import urllib.parse
 import base64
-from .base_agent import BaseAPIAgent, APIIntent, APIResponse
+import sys
+import time
+from collections import OrderedDict
+from .base_agent import BaseAPIAgent, APIIntent, APIResponse, _get_shared_client, json_dumps, json_loads
+
+# Most recent logins kept in memory; older ones have to authenticate again
+_AUTH_CACHE_SIZE = 4096
 
 class AuthAgent(BaseAPIAgent):
     """
@@ -21,8 +26,14 @@ class AuthAgent(BaseAPIAgent):
         # Initialize without auth_config since this agent handles authentication
         super().__init__(name="AuthAgent", base_url=base_url, auth_config={})
         self.rate_limit_delay = 1.0  # 1 second for auth operations
-        self.authenticated_users = {}  # Cache authenticated users
-        
+        self.authenticated_users: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # username -> auth info, LRU order
+        # user_id / token -> username, so each login is stored once
+        self._uid_to_username: Dict[str, str] = {}
+        self._token_to_username: Dict[str, str] = {}
+        # Login endpoint and paging params never change for this agent
+        self._auth_url = f"{base_url.rstrip('/')}/persons/authenticate"
+        self._static_params = {"page": "1", "max_results": "10"}
+    
     def get_supported_intents(self) -> List[APIIntent]:
         return [APIIntent.VALIDATE, APIIntent.READ]
     
@@ -59,118 +70,123 @@ class AuthAgent(BaseAPIAgent):
                 agent_name=self.name
             )
     
+    def _get_encoded_credentials(self, username: str, password: str) -> Tuple[str, str]:
+        """Base64 credentials and URL-encoded WHERE query for a login"""
+        # Build the WHERE query as per API specification
+        where_query = {
+            "$or": [
+                {"username": username},
+                {"password": password}
+            ]
+        }
+        
+        # URL encode the JSON query
+        where_param = urllib.parse.quote(json_dumps(where_query))
+        credentials_b64 = base64.b64encode(f"{username}:{password}".encode()).decode()
+        return credentials_b64, where_param
+    
     async def _authenticate_user(self, username: str, password: str) -> APIResponse:
         """
         Authenticate user using the persons/authenticate API
         URL: /persons/authenticate?page=1&max_results=10&where={"$or":[{"username":"917340224449"},{"password":"12345"}]}
         """
         try:
-            # Build the WHERE query as per API specification
-            where_query = {
-                "$or": [
-                    {"username": username},
-                    {"password": password}
-                ]
-            }
-            
-            # URL encode the JSON query
-            where_param = urllib.parse.quote(json.dumps(where_query))
+            credentials_b64, where_param = self._get_encoded_credentials(username, password)
             
             # Build query parameters
-            params = {
-                "page": "1",
-                "max_results": "10", 
-                "where": where_param
-            }
+            params = {**self._static_params, "where": where_param}
             
-            # Create basic auth header using username:password
-            credentials = f"{username}:{password}"
-            credentials_b64 = base64.b64encode(credentials.encode()).decode()
+            # Basic auth header using username:password
             headers = {
                 "Authorization": f"Basic {credentials_b64}",
                 "Content-Type": "application/json"
             }
             
             # Make the authentication request
-            import httpx
-            import asyncio
-            
-            start_time = asyncio.get_event_loop().time()
+            start_time = time.perf_counter()
             await self._enforce_rate_limit()
             
-            url = f"{self.base_url.rstrip('/')}/persons/authenticate"
+            url = self._auth_url
             
-            async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-                response = await client.get(url, headers=headers, params=params)
-                
-                execution_time = asyncio.get_event_loop().time() - start_time
+            # The running loop's pooled client - logins come from both the API loop and LangChain's loops
+            response = await _get_shared_client().get(url, headers=headers, params=params)
+            
+            execution_time = time.perf_counter() - start_time
+            
+            if response.status_code == 200:
+                auth_data = json_loads(response.content)
                 
-                if response.status_code == 200:
-                    auth_data = response.json()
+                # Extract authentication details from response
+                if auth_data.get("ok") and auth_data.get("token"):
+                    user_record = auth_data.get("user_record", {})
+                    token = auth_data.get("token")
+                    user_id = user_record.get("_id")
                     
-                    # Extract authentication details from response
-                    if auth_data.get("ok") and auth_data.get("token"):
-                        user_record = auth_data.get("user_record", {})
-                        token = auth_data.get("token")
-                        user_id = user_record.get("_id")
-                        
-                        # Cache the authenticated user
-                        auth_info = {
+                    # Cache the authenticated user
+                    auth_info = {
+                        "token": token,
+                        "user_id": user_id,
+                        "username": username,
+                        "user_record": user_record,
+                        "auth_header": f"Basic {credentials_b64}",
+                        "credentials_b64": credentials_b64
+                    }
+                    
+                    # Stored once by username, with id/token indexes; user_id may be missing from the record
+                    username_key = sys.intern(username)
+                    self._drop_indexes(self.authenticated_users.get(username_key))
+                    self.authenticated_users[username_key] = auth_info
+                    self._token_to_username[sys.intern(token)] = username_key
+                    if user_id:
+                        self._uid_to_username[sys.intern(user_id)] = username_key
+                    # Evict least recently used logins past the cap
+                    while len(self.authenticated_users) > _AUTH_CACHE_SIZE:
+                        _, evicted = self.authenticated_users.popitem(last=False)
+                        self._drop_indexes(evicted)
+                    
+                    return APIResponse(
+                        success=True,
+                        data={
+                            "authenticated": True,
                             "token": token,
                             "user_id": user_id,
-                            "username": username,
                             "user_record": user_record,
                             "auth_header": f"Basic {credentials_b64}",
-                            "credentials_b64": credentials_b64
-                        }
-                        
-                        self.authenticated_users[username] = auth_info
-                        self.authenticated_users[user_id] = auth_info
-                        self.authenticated_users[token] = auth_info
-                        
-                        return APIResponse(
-                            success=True,
-                            data={
-                                "authenticated": True,
-                                "token": token,
-                                "user_id": user_id,
-                                "user_record": user_record,
-                                "auth_header": f"Basic {credentials_b64}",
-                                "credentials_b64": credentials_b64,
-                                "username": username,
-                                "name": user_record.get("name"),
-                                "email": user_record.get("email"),
-                                "phone": user_record.get("phone"),
-                                "current_company": user_record.get("current_company"),
-                                "role_names": user_record.get("role_names", []),
-                                "user_type": user_record.get("user_type"),
-                                "status_text": auth_data.get("statusText", "Successfully Logged In!")
-                            },
-                            status_code=response.status_code,
-                            agent_name=self.name,
-                            execution_time=execution_time,
-                            sources=[url]
-                        )
-                    else:
-                        return APIResponse(
-                            success=False,
-                            error="Authentication failed: Invalid response format",
-                            status_code=response.status_code,
-                            agent_name=self.name,
-                            execution_time=execution_time,
-                            sources=[url]
-                        )
+                            "credentials_b64": credentials_b64,
+                            "username": username,
+                            "name": user_record.get("name"),
+                            "email": user_record.get("email"),
+                            "phone": user_record.get("phone"),
+                            "current_company": user_record.get("current_company"),
+                            "role_names": user_record.get("role_names", []),
+                            "user_type": user_record.get("user_type"),
+                            "status_text": auth_data.get("statusText", "Successfully Logged In!")
+                        },
+                        status_code=response.status_code,
+                        agent_name=self.name,
+                        execution_time=execution_time,
+                        sources=[url]
+                    )
                 else:
-                    error_text = response.text if response.content else "Authentication failed"
                     return APIResponse(
                         success=False,
-                        error=f"Authentication failed: HTTP {response.status_code} - {error_text}",
+                        error="Authentication failed: Invalid response format",
                         status_code=response.status_code,
                         agent_name=self.name,
                         execution_time=execution_time,
                         sources=[url]
                     )
-                    
+            else:
+                error_text = response.text if response.content else "Authentication failed"
+                return APIResponse(
+                    success=False,
+                    error=f"Authentication failed: HTTP {response.status_code} - {error_text}",
+                    status_code=response.status_code,
+                    agent_name=self.name,
+                    execution_time=execution_time,
+                    sources=[url]
+                )
+                
         except Exception as e:
             return APIResponse(
                 success=False,
@@ -178,12 +194,36 @@ class AuthAgent(BaseAPIAgent):
                 agent_name=self.name
             )
     
+    def _resolve(self, key: Optional[str]) -> Optional[str]:
+        """Map a username, user_id or token to the username the login is stored under"""
+        if key in self.authenticated_users:
+            return key
+        return self._token_to_username.get(key) or self._uid_to_username.get(key)
+    
+    def _lookup(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Auth info for a username, user_id or token"""
+        username = self._resolve(key)
+        if username is None:
+            return None
+        self.authenticated_users.move_to_end(username)
+        return self.authenticated_users[username]
+    
+    def _drop_indexes(self, auth_info: Optional[Dict[str, Any]]):
+        """Remove the token/user_id index entries that still point at a stored login"""
+        if not auth_info:
+            return
+        username = auth_info.get("username")
+        for index, key in ((self._token_to_username, auth_info.get("token")),
+                           (self._uid_to_username, auth_info.get("user_id"))):
+            if index.get(key) == username:
+                del index[key]
+    
     async def _get_user_details(self, data: Dict[str, Any]) -> APIResponse:
         """Get user details from cached authentication data"""
         lookup_key = data.get("token") or data.get("user_id")
+        auth_info = self._lookup(lookup_key)
         
-        if lookup_key in self.authenticated_users:
-            auth_info = self.authenticated_users[lookup_key]
+        if auth_info is not None:
             return APIResponse(
                 success=True,
                 data={
@@ -205,54 +245,42 @@ class AuthAgent(BaseAPIAgent):
     
     def get_auth_token_for_user(self, username: str) -> Optional[str]:
         """Get auth token for a specific user"""
-        if username in self.authenticated_users:
-            return self.authenticated_users[username]["token"]
-        return None
+        auth_info = self._lookup(username)
+        return auth_info["token"] if auth_info is not None else None
     
     def get_basic_auth_header_for_user(self, username: str) -> Optional[str]:
         """Get Basic Auth header for a specific user"""
-        if username in self.authenticated_users:
-            return self.authenticated_users[username]["auth_header"]
-        return None
+        auth_info = self._lookup(username)
+        return auth_info["auth_header"] if auth_info is not None else None
     
     def get_credentials_b64_for_user(self, username: str) -> Optional[str]:
         """Get base64 encoded credentials for a specific user"""
-        if username in self.authenticated_users:
-            return self.authenticated_users[username]["credentials_b64"]
-        return None
+        auth_info = self._lookup(username)
+        return auth_info["credentials_b64"] if auth_info is not None else None
     
     def is_user_authenticated(self, username: str) -> bool:
         """Check if user is authenticated"""
-        return username in self.authenticated_users
+        return self._resolve(username) is not None
     
     def get_user_info(self, username: str) -> Optional[Dict[str, Any]]:
         """Get complete user information"""
-        if username in self.authenticated_users:
-            return self.authenticated_users[username]
-        return None
+        return self._lookup(username)
     
     def logout_user(self, username: str) -> bool:
         """Remove user from authenticated users cache"""
-        if username in self.authenticated_users:
-            auth_info = self.authenticated_users[username]
-            
-            # Remove all references to this user
-            keys_to_remove = [
-                username,
-                auth_info.get("user_id"),
-                auth_info.get("token")
-            ]
-            
-            for key in keys_to_remove:
-                if key and key in self.authenticated_users:
-                    del self.authenticated_users[key]
-            
-            return True
-        return False
+        canonical = self._resolve(username)
+        if canonical is None:
+            return False
+        
+        # Remove all references to this user
+        self._drop_indexes(self.authenticated_users.pop(canonical))
+        return True
     
     def clear_all_auth_cache(self):
         """Clear all authenticated users cache"""
         self.authenticated_users.clear()
+        self._uid_to_username.clear()
+        self._token_to_username.clear()
     
     async def authenticate_and_get_auth_header(self, username: str, password: str) -> Tuple[bool, Optional[str], Optional[Dict]]:
         """
@@ -4,31 +4,28 @@ Shows how to authenticate users and use the credentials for API operations
 """
 import asyncio
 import json
-from dotenv import load_dotenv
+from types import MappingProxyType
 
 from agent_manager import agent_manager, WorkflowIntent
 from base_agent import APIIntent
 
-load_dotenv()
+# Test credentials (replace with actual credentials) - from the example API call
+TEST_USERNAME = "917340224449"
+TEST_PASSWORD = "12345"
+TEST_CREDS = MappingProxyType({"username": TEST_USERNAME, "password": TEST_PASSWORD})
 
 async def example_authentication_workflow():
     """Example: Complete authentication workflow"""
     print("\n🔐 AUTHENTICATION WORKFLOW EXAMPLE")
     print("=" * 50)
     
-    # Test credentials (replace with actual credentials)
-    test_credentials = {
-        "username": "917340224449",  # From the example API call
-        "password": "12345"          # From the example API call
-    }
-    
-    print(f"Testing authentication with username: {test_credentials['username']}")
+    print(f"Testing authentication with username: {TEST_USERNAME}")
     
     # Step 1: Authenticate user and setup all agents
     print("\n1. Authenticating user...")
     success, user_info, error = await agent_manager.authenticate_user_and_setup(
-        test_credentials["username"], 
-        test_credentials["password"]
+        TEST_USERNAME, 
+        TEST_PASSWORD
     )
     
     if success:
@@ -55,10 +52,7 @@ async def example_direct_auth_agent():
     
     # Test authentication directly with auth agent
     auth_response = await agent_manager.execute_single_intent(
-        "auth", APIIntent.VALIDATE, {
-            "username": "917340224449",
-            "password": "12345"
-        }
+        "auth", APIIntent.VALIDATE, TEST_CREDS
     )
     
     print(f"Direct auth result: {auth_response.success}")
@@ -92,35 +86,55 @@ async def test_authenticated_operations():
     print("\n📋 TESTING AUTHENTICATED OPERATIONS")
     print("-" * 40)
     
-    # Test 1: Search cities (should work with authenticated credentials)
-    print("🏙️  Testing city search...")
-    city_response = await agent_manager.execute_single_intent(
-        "city", APIIntent.SEARCH, {"city_name": "Jaipur"}
-    )
-    print(f"   City search result: {city_response.success}")
-    if not city_response.success:
-        print(f"   Error: {city_response.error}")
-    
-    # Test 2: Search materials (should work with authenticated credentials)
-    print("\n🧱 Testing material search...")
-    material_response = await agent_manager.execute_single_intent(
-        "material", APIIntent.SEARCH, {"material_name": "paint"}
-    )
-    print(f"   Material search result: {material_response.success}")
-    if not material_response.success:
-        print(f"   Error: {material_response.error}")
-    
-    # Test 3: Create trip (should work with authenticated credentials)
-    print("\n🚛 Testing trip creation...")
-    trip_response = await agent_manager.execute_single_intent(
-        "trip", APIIntent.CREATE, {}
-    )
-    print(f"   Trip creation result: {trip_response.success}")
-    if trip_response.success and trip_response.data:
-        trip_id = trip_response.data.get("extracted_trip_id")
-        print(f"   Created trip ID: {trip_id}")
-    else:
-        print(f"   Error: {trip_response.error}")
+    # The three calls are independent - start them together and report each one as soon as it finishes
+    async def run(label, agent_name, intent, data):
+        try:
+            return label, await agent_manager.execute_single_intent(agent_name, intent, data)
+        except Exception as e:
+            return label, e
+    
+    print("🏙️  Testing city search, 🧱 material search and 🚛 trip creation concurrently...")
+    tasks = [
+        asyncio.create_task(run("city", "city", APIIntent.SEARCH, {"city_name": "Jaipur"})),
+        asyncio.create_task(run("material", "material", APIIntent.SEARCH, {"material_name": "paint"})),
+        asyncio.create_task(run("trip", "trip", APIIntent.CREATE, {}))
+    ]
+    
+    for next_done in asyncio.as_completed(tasks):
+        label, response = await next_done
+        
+        if label == "city":
+            # Test 1: Search cities (should work with authenticated credentials)
+            print("\n🏙️  City search...")
+            if isinstance(response, Exception):
+                print(f"   Error: {response}")
+            else:
+                print(f"   City search result: {response.success}")
+                if not response.success:
+                    print(f"   Error: {response.error}")
+        
+        elif label == "material":
+            # Test 2: Search materials (should work with authenticated credentials)
+            print("\n🧱 Material search...")
+            if isinstance(response, Exception):
+                print(f"   Error: {response}")
+            else:
+                print(f"   Material search result: {response.success}")
+                if not response.success:
+                    print(f"   Error: {response.error}")
+        
+        else:
+            # Test 3: Create trip (should work with authenticated credentials)
+            print("\n🚛 Trip creation...")
+            if isinstance(response, Exception):
+                print(f"   Error: {response}")
+            else:
+                print(f"   Trip creation result: {response.success}")
+                if response.success and response.data:
+                    trip_id = response.data.get("extracted_trip_id")
+                    print(f"   Created trip ID: {trip_id}")
+                else:
+                    print(f"   Error: {response.error}")
 
 async def example_auth_workflow_integration():
     """Example: How authentication integrates with other workflows"""
@@ -130,7 +144,7 @@ async def example_auth_workflow_integration():
     # Step 1: Authenticate
     print("1. Authenticating user...")
     auth_success, user_info, auth_error = await agent_manager.authenticate_user_and_setup(
-        "917340224449", "12345"
+        TEST_USERNAME, TEST_PASSWORD
     )
     
     if not auth_success:
@@ -175,14 +189,11 @@ async def example_auth_cache_management():
     # Authenticate and check cache
     print("1. Authenticating and caching user...")
     auth_response = await agent_manager.execute_single_intent(
-        "auth", APIIntent.VALIDATE, {
-            "username": "917340224449",
-            "password": "12345"
-        }
+        "auth", APIIntent.VALIDATE, TEST_CREDS
     )
     
     if auth_response.success:
-        username = "917340224449"
+        username = TEST_USERNAME
         print(f"✅ User {username} authenticated and cached")
         
         # Check if user is in cache
@@ -231,4 +242,14 @@ async def main():
     print("\n✅ All authentication examples completed!")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:  # Windows, or uvloop not installed - default event loop
+        uvloop = None
+    
+    # The loop is picked here at the entry point; importing the agents never changes it
+    if uvloop is not None and hasattr(asyncio, "Runner"):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -3,17 +3,229 @@ Base Agent Class for API Operations
 Provides common functionality for all specialized API agents
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator, Protocol, Callable
+from collections import OrderedDict
 import httpx
 import asyncio
 import logging
 import json
 import base64
-from pydantic import BaseModel
+import hashlib
+import os
+import time
+import weakref
+from dataclasses import dataclass, field, fields, is_dataclass
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx (httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import orjson
+
+    def json_dumps(obj: Any) -> str:
+        """Compact JSON text - orjson when installed"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    def _json_default(obj: Any) -> Any:
+        # orjson serializes dataclasses natively (e.g. CityRecord in response data)
+        if is_dataclass(obj):
+            return {f.name: getattr(obj, f.name) for f in fields(obj)}
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+    def json_dumps(obj: Any) -> str:
+        """Compact JSON text - orjson when installed"""
+        # Compact separators match orjson's output
+        return json.dumps(obj, separators=(",", ":"), default=_json_default)
+
+    json_loads = json.loads
+
+_SUPPORTED_METHODS = frozenset({"GET", "POST", "PUT", "DELETE"})
+
+# One pooled client per event loop - LangChain tools run agents on short-lived loops via asyncio.run,
+# and a client's connections cannot be reused once the loop that opened them is gone
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def _get_shared_client() -> httpx.AsyncClient:
+    """Keep-alive client shared by every agent on the running loop, created on first use"""
+    # No await between the check and the store, so concurrent callers can't build two clients
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            verify=False,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            http2=HTTP2_AVAILABLE
+        )
+        _shared_clients[loop] = client
+    return client
+
+async def _parse_items(chunks: AsyncIterator[bytes], transform: Callable[[Dict[str, Any]], Any]) -> List[Any]:
+    """Parse the _items records as the body streams in, keeping only transform(record) for each"""
+    parsed = ijson.sendable_list()
+    parser = ijson.items_coro(parsed, "_items.item", use_float=True)
+    items = []
+    async for chunk in chunks:
+        parser.send(chunk)
+        items.extend(map(transform, parsed))
+        del parsed[:]
+    parser.close()
+    items.extend(map(transform, parsed))
+    return items
+
+class HTTPBackend(Protocol):
+    """Transport used by BaseAPIAgent._make_request - returns the status code and raw body"""
+    
+    async def request(self, method: str, url: httpx.URL, *, headers: Dict[str, str],
+                      json: Optional[Dict] = None, params: Optional[Dict] = None) -> Tuple[int, bytes]:
+        ...
+    
+    async def request_items(self, method: str, url: httpx.URL, *, headers: Dict[str, str], params: Optional[Dict],
+                            transform: Callable[[Dict[str, Any]], Any]) -> Tuple[int, bytes, Optional[List[Any]]]:
+        """Stream a list response - (status, b"", projected items) on success, (status, body, None) otherwise"""
+        ...
+    
+    async def aclose(self):
+        ...
+
+class HttpxBackend:
+    """Default transport - the pooled httpx client for the running loop, HTTP/2 when h2 is installed"""
+    
+    async def request(self, method: str, url: httpx.URL, *, headers: Dict[str, str],
+                      json: Optional[Dict] = None, params: Optional[Dict] = None) -> Tuple[int, bytes]:
+        response = await _get_shared_client().request(method, url, headers=headers, json=json, params=params)
+        return response.status_code, response.content
+    
+    async def request_items(self, method: str, url: httpx.URL, *, headers: Dict[str, str], params: Optional[Dict],
+                            transform: Callable[[Dict[str, Any]], Any]) -> Tuple[int, bytes, Optional[List[Any]]]:
+        async with _get_shared_client().stream(method, url, headers=headers, params=params) as response:
+            if response.status_code not in (200, 201):
+                return response.status_code, await response.aread(), None
+            return response.status_code, b"", await _parse_items(response.aiter_bytes(), transform)
+    
+    async def aclose(self):
+        client = _shared_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+class AiohttpBackend:
+    """aiohttp transport - less per-request overhead for many small JSON calls, HTTP/1.1 only"""
+    
+    def __init__(self):
+        # One session per event loop, for the same reason as _shared_clients
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+    
+    def _get_session(self) -> "aiohttp.ClientSession":
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ssl=False),
+                timeout=aiohttp.ClientTimeout(total=30.0)
+            )
+            self._sessions[loop] = session
+        return session
+    
+    async def request(self, method: str, url: httpx.URL, *, headers: Dict[str, str],
+                      json: Optional[Dict] = None, params: Optional[Dict] = None) -> Tuple[int, bytes]:
+        async with self._get_session().request(method, str(url), headers=headers, json=json, params=params) as response:
+            return response.status, await response.read()
+    
+    async def request_items(self, method: str, url: httpx.URL, *, headers: Dict[str, str], params: Optional[Dict],
+                            transform: Callable[[Dict[str, Any]], Any]) -> Tuple[int, bytes, Optional[List[Any]]]:
+        async with self._get_session().request(method, str(url), headers=headers, params=params) as response:
+            if response.status not in (200, 201):
+                return response.status, await response.read(), None
+            return response.status, b"", await _parse_items(response.content.iter_chunked(65536), transform)
+    
+    async def aclose(self):
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+def _select_backend() -> HTTPBackend:
+    """httpx unless AGENT_HTTP_BACKEND=aiohttp and aiohttp is installed"""
+    if os.getenv("AGENT_HTTP_BACKEND", "httpx").lower() == "aiohttp":
+        if AIOHTTP_AVAILABLE:
+            return AiohttpBackend()
+        logger.warning("AGENT_HTTP_BACKEND=aiohttp but aiohttp is not installed - using httpx")
+    return HttpxBackend()
+
+_http_backend: HTTPBackend = _select_backend()
+
+async def aclose_shared_client():
+    """Close the running loop's shared agent transport - called on application shutdown"""
+    await _http_backend.aclose()
+    # AuthAgent logs in through the httpx client whichever backend the other agents use
+    client = _shared_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+# Bounds on the refill interval while backing off from 429s
+_MIN_BACKOFF_INTERVAL = 0.05
+_MAX_BACKOFF_INTERVAL = 60.0
+
+class _TokenBucket:
+    """
+    Rate limiter that lets up to `capacity` calls start at once and refills one slot every `interval` seconds
+    Concurrent callers proceed in parallel while slots remain instead of queueing behind a fixed delay.
+    The refill rate adapts: halved on each 429, then stepped back up to the configured rate on successes
+    """
+    __slots__ = ("interval", "base_interval", "capacity", "tokens", "updated")
+    
+    def __init__(self, interval: float, capacity: int):
+        self.interval = interval
+        self.base_interval = interval
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+    
+    def backoff(self):
+        """Server said 429 - halve the refill rate and drop any remaining burst"""
+        self.interval = min(max(self.interval, _MIN_BACKOFF_INTERVAL) * 2, _MAX_BACKOFF_INTERVAL)
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+    
+    def recover(self):
+        """A call succeeded - add back a tenth of the configured rate, never exceeding it"""
+        if self.interval > self.base_interval:
+            step = 1 / max(self.base_interval, _MIN_BACKOFF_INTERVAL) / 10
+            self.interval = max(self.base_interval, 1 / (1 / self.interval + step))
+    
+    async def acquire(self):
+        # Refill and take happen without an await in between, so no lock is needed
+        while True:
+            now = time.monotonic()
+            if self.interval > 0:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+            else:
+                self.tokens = self.capacity
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * self.interval)
+
 class APIIntent(Enum):
     """Define different API operation intents"""
     CREATE = "create"
@@ -24,8 +236,15 @@ class APIIntent(Enum):
     LIST = "list"
     VALIDATE = "validate"
 
-class APIResponse(BaseModel):
-    """Standardized API response model"""
+# Intents whose responses are cached per payload
+_CACHEABLE_INTENTS = frozenset({APIIntent.READ, APIIntent.SEARCH, APIIntent.LIST})
+# Successful reads are kept for minutes; upstream failures only long enough to absorb a retry burst
+_CACHE_TTL = 300
+_NEGATIVE_CACHE_TTL = 10
+
+@dataclass(slots=True, kw_only=True)
+class APIResponse:
+    """Standardized API response model - built on every call and cache hit, so no per-instance validation"""
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
@@ -33,7 +252,11 @@ class APIResponse(BaseModel):
     intent: Optional[str] = None
     agent_name: Optional[str] = None
     execution_time: Optional[float] = None
-    sources: List[str] = []
+    sources: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict view for JSON responses (dataclasses.asdict would deep-copy data)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
 
 class BaseAPIAgent(ABC):
     """
@@ -41,24 +264,51 @@ class BaseAPIAgent(ABC):
     Each agent handles specific API endpoints with defined intents
     """
     
+    # Shared per-request state lives in slots; subclasses keep a __dict__ for their own attributes
+    __slots__ = (
+        "name", "base_url", "_base_url", "auth_config",
+        "cache", "cache_max", "cache_ttl", "_inflight", "_supported_intent_set",
+        "rate_limit_delay", "rate_limit_burst", "_rate_limiter",
+        "_auth_headers", "_auth_headers_key"
+    )
+    
     def __init__(self, name: str, base_url: str, auth_config: Dict[str, str]):
         self.name = name
         self.base_url = base_url
+        # Parsed once; endpoints are joined onto it per request (trailing slash keeps the last path segment)
+        self._base_url = httpx.URL(base_url if base_url.endswith("/") else base_url + "/")
         self.auth_config = auth_config
-        self.cache = {}
-        self.rate_limit_delay = 1.0  # Default 1 second between calls
-        self.last_request_time = 0
+        self.cache: "OrderedDict[str, Tuple[float, APIResponse]]" = OrderedDict()  # key -> (expires, response), LRU order
+        self.cache_max = 1024  # Least recently used responses are evicted past this size
+        self.cache_ttl = _CACHE_TTL  # Seconds a successful read stays cached
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache key -> pending call, so concurrent duplicates share it
+        self._supported_intent_set: Optional[frozenset] = None  # get_supported_intents() as a set, built on first execute
+        self.rate_limit_delay = 1.0  # Default 1 second per request slot
+        self.rate_limit_burst = 4  # Requests that may be in flight before the delay applies
+        self._rate_limiter: Optional[_TokenBucket] = None  # Built on first request from the settings above
+        # Headers for the credentials last seen in auth_config - the dict is shared and updated in place after login
+        self._auth_headers: Dict[str, str] = {}
+        self._auth_headers_key: Optional[Tuple[Any, Any, Any]] = None
         
     def get_auth_headers(self) -> Dict[str, str]:
+        """Authentication headers, rebuilt only when the credentials in auth_config change - treat as read-only"""
+        auth_config = self.auth_config
+        key = (auth_config.get("token"), auth_config.get("username"), auth_config.get("password"))
+        if key != self._auth_headers_key:
+            self._auth_headers = self._build_auth_headers(*key)
+            self._auth_headers_key = key
+        return self._auth_headers
+    
+    @staticmethod
+    def _build_auth_headers(token: Optional[str], username: Optional[str], password: Optional[str]) -> Dict[str, str]:
         """Generate authentication headers"""
-        if self.auth_config.get("token"):
+        if token:
             return {
-                "Authorization": self.auth_config["token"],
+                "Authorization": token,
                 "Content-Type": "application/json"
             }
-        elif self.auth_config.get("username") and self.auth_config.get("password"):
-            credentials = f"{self.auth_config['username']}:{self.auth_config['password']}"
-            credentials_b64 = base64.b64encode(credentials.encode()).decode()
+        elif username and password:
+            credentials_b64 = base64.b64encode(f"{username}:{password}".encode()).decode()
             return {
                 "Authorization": f"Basic {credentials_b64}",
                 "Content-Type": "application/json"
@@ -67,68 +317,97 @@ class BaseAPIAgent(ABC):
             return {"Content-Type": "application/json"}
     
     async def _enforce_rate_limit(self):
-        """Enforce rate limiting between API calls"""
-        current_time = asyncio.get_event_loop().time()
-        elapsed = current_time - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = asyncio.get_event_loop().time()
+        """Wait for a rate-limit slot - bursts run concurrently, sustained load is held to one call per rate_limit_delay"""
+        if self._rate_limiter is None:
+            self._rate_limiter = _TokenBucket(self.rate_limit_delay, self.rate_limit_burst)
+        await self._rate_limiter.acquire()
     
     async def _make_request(self, method: str, endpoint: str, payload: Optional[Dict] = None, 
-                          params: Optional[Dict] = None) -> APIResponse:
-        """Make HTTP request with error handling and timing"""
-        start_time = asyncio.get_event_loop().time()
+                          params: Optional[Dict] = None,
+                          item_transform: Optional[Callable[[Dict[str, Any]], Any]] = None) -> APIResponse:
+        """
+        Make HTTP request with error handling and timing
+        With item_transform, a GET list response comes back as {"_items": [item_transform(record), ...]};
+        when ijson is installed the records are projected while the body streams in
+        """
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         
         try:
             await self._enforce_rate_limit()
             
-            url = f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+            url = self._base_url.join(endpoint.lstrip("/"))
             headers = self.get_auth_headers()
             
             logger.info(f"{self.name}: {method} {url}")
-            if payload:
-                logger.debug(f"{self.name}: Payload: {json.dumps(payload, indent=2)}")
+            # Serialize bodies for the log only when that level is actually emitted
+            if payload and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s: Payload: %s", self.name, json_dumps(payload))
+            
+            method = method.upper()
+            if method not in _SUPPORTED_METHODS:
+                raise ValueError(f"Unsupported HTTP method: {method}")
+            
+            # GET sends only query params, POST/PUT only a JSON body, DELETE neither
+            items = None
+            if item_transform is not None and method == "GET" and IJSON_AVAILABLE:
+                status_code, content, items = await _http_backend.request_items(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    transform=item_transform
+                )
+            else:
+                status_code, content = await _http_backend.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params if method == "GET" else None,
+                    json=payload if method in ("POST", "PUT") else None
+                )
+            
+            execution_time = loop.time() - start_time
             
-            async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-                if method.upper() == "GET":
-                    response = await client.get(url, headers=headers, params=params)
-                elif method.upper() == "POST":
-                    response = await client.post(url, headers=headers, json=payload)
-                elif method.upper() == "PUT":
-                    response = await client.put(url, headers=headers, json=payload)
-                elif method.upper() == "DELETE":
-                    response = await client.delete(url, headers=headers)
+            logger.info(f"{self.name}: Response status: {status_code}")
+            
+            # Slow down while the server is throttling us, speed back up as calls succeed
+            if status_code == 429:
+                self._rate_limiter.backoff()
+            elif status_code in (200, 201):
+                self._rate_limiter.recover()
+            
+            if status_code in (200, 201):
+                if items is not None:
+                    data = {"_items": items}
                 else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
-                execution_time = asyncio.get_event_loop().time() - start_time
-                
-                logger.info(f"{self.name}: Response status: {response.status_code}")
+                    data = json_loads(content) if content else {}
+                    if item_transform is not None:
+                        data = {"_items": [item_transform(record) for record in data.get("_items", [])]}
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("%s: SUCCESS Response data: %s", self.name, json_dumps(data))
+                return APIResponse(
+                    success=True,
+                    data=data,
+                    status_code=status_code,
+                    agent_name=self.name,
+                    execution_time=execution_time,
+                    sources=[str(url)]
+                )
+            else:
+                error_text = content.decode("utf-8", errors="replace")
+                logger.error(f"{self.name}: API Error {status_code}: {error_text}")
+                return APIResponse(
+                    success=False,
+                    error=f"HTTP {status_code}: {error_text}",
+                    status_code=status_code,
+                    agent_name=self.name,
+                    execution_time=execution_time,
+                    sources=[str(url)]
+                )
                 
-                if response.status_code in [200, 201]:
-                    data = response.json() if response.content else {}
-                    logger.info(f"{self.name}: SUCCESS Response data: {json.dumps(data, indent=2)}")
-                    return APIResponse(
-                        success=True,
-                        data=data,
-                        status_code=response.status_code,
-                        agent_name=self.name,
-                        execution_time=execution_time,
-                        sources=[url]
-                    )
-                else:
-                    logger.error(f"{self.name}: API Error {response.status_code}: {response.text}")
-                    return APIResponse(
-                        success=False,
-                        error=f"HTTP {response.status_code}: {response.text}",
-                        status_code=response.status_code,
-                        agent_name=self.name,
-                        execution_time=execution_time,
-                        sources=[url]
-                    )
-                    
         except Exception as e:
-            execution_time = asyncio.get_event_loop().time() - start_time
+            execution_time = loop.time() - start_time
             logger.error(f"{self.name}: Request failed: {str(e)}")
             return APIResponse(
                 success=False,
@@ -153,33 +432,37 @@ class BaseAPIAgent(ABC):
         pass
     
     def get_cache_key(self, intent: APIIntent, data: Dict[str, Any]) -> str:
-        """Generate cache key for request"""
-        return f"{self.name}:{intent.value}:{hash(str(sorted(data.items())))}"
+        """Generate cache key for request - stable across processes and independent of key order at any depth"""
+        payload = json.dumps(data, sort_keys=True, default=str, separators=(",", ":")).encode()
+        return f"{self.name}:{intent.value}:{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
     
     def cache_response(self, key: str, response: APIResponse, ttl: int = 300):
         """Cache API response for given TTL (seconds)"""
-        import time
-        self.cache[key] = {
-            "response": response,
-            "expires": time.time() + ttl
-        }
+        self.cache[key] = (time.monotonic() + ttl, response)
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_max:
+            self.cache.popitem(last=False)
     
     def get_cached_response(self, key: str) -> Optional[APIResponse]:
         """Get cached response if still valid"""
-        import time
-        if key in self.cache:
-            cached = self.cache[key]
-            if time.time() < cached["expires"]:
-                logger.info(f"{self.name}: Using cached response")
-                return cached["response"]
-            else:
-                del self.cache[key]
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        expires, response = cached
+        if time.monotonic() < expires:
+            self.cache.move_to_end(key)
+            logger.info(f"{self.name}: Using cached response")
+            return response
+        del self.cache[key]
         return None
     
     async def execute(self, intent: APIIntent, data: Dict[str, Any], use_cache: bool = True) -> APIResponse:
         """Execute agent with given intent and data"""
-        # Check if intent is supported
-        if intent not in self.get_supported_intents():
+        # Check if intent is supported - subclasses return a fixed list, so it is turned into a set once
+        supported = self._supported_intent_set
+        if supported is None:
+            supported = self._supported_intent_set = frozenset(self.get_supported_intents())
+        if intent not in supported:
             return APIResponse(
                 success=False,
                 error=f"Intent {intent.value} not supported by {self.name}",
@@ -197,22 +480,84 @@ class BaseAPIAgent(ABC):
                 intent=intent.value
             )
         
-        # Check cache for READ operations
-        if use_cache and intent in [APIIntent.READ, APIIntent.SEARCH, APIIntent.LIST]:
+        # Check cache for READ operations - a hit returns before the first await
+        cache_key = None
+        if use_cache and intent in _CACHEABLE_INTENTS:
             cache_key = self.get_cache_key(intent, data)
             cached_response = self.get_cached_response(cache_key)
             if cached_response:
                 cached_response.intent = intent.value
                 return cached_response
         
-        # Execute the intent
-        response = await self.handle_intent(intent, data)
+        # Execute the intent - identical concurrent reads share one upstream call
+        if cache_key is not None:
+            loop = asyncio.get_running_loop()
+            # LangChain tools can drive the same agent from another thread's loop - only join our own
+            while (inflight := self._inflight.get(cache_key)) is not None and inflight.get_loop() is loop:
+                # Shielded so a cancelled waiter doesn't cancel the shared call
+                shared = await asyncio.shield(inflight)
+                if shared is not None:
+                    return shared
+                # None - the owning call was cancelled; that's a miss for us, so join or start another
+            
+            future = loop.create_future()
+            self._inflight[cache_key] = future
+            try:
+                response = await self.handle_intent(intent, data)
+            except Exception as e:
+                # Waiters see the same error; marked retrieved so an unjoined future doesn't log a warning
+                future.set_exception(e)
+                future.exception()
+                raise
+            except BaseException:
+                # Cancelling the owner must not cancel its waiters - they retry on their own
+                future.set_result(None)
+                raise
+            finally:
+                if self._inflight.get(cache_key) is future:
+                    del self._inflight[cache_key]
+            future.set_result(response)
+        else:
+            response = await self.handle_intent(intent, data)
         response.intent = intent.value
         
-        # Cache successful READ operations
-        if (use_cache and response.success and 
-            intent in [APIIntent.READ, APIIntent.SEARCH, APIIntent.LIST]):
-            cache_key = self.get_cache_key(intent, data)
-            self.cache_response(cache_key, response)
+        # Cache READ operations - failures briefly, except client errors that a retry with other input would fix
+        if cache_key is not None:
+            if response.success:
+                self.cache_response(cache_key, response, self.cache_ttl)
+            elif not self._is_client_error(response):
+                self.cache_response(cache_key, response, _NEGATIVE_CACHE_TTL)
+        
+        return response
+    
+    async def execute_many(self, requests: List[Tuple[APIIntent, Dict[str, Any]]]) -> AsyncIterator[Tuple[int, APIResponse]]:
+        """Run several intents concurrently, yielding (position in requests, response) as each one completes"""
+        async def run(position: int, intent: APIIntent, data: Dict[str, Any]) -> Tuple[int, APIResponse]:
+            return position, await self.execute(intent, data)
         
-        return response
\ No newline at end of file
+        tasks = [asyncio.create_task(run(position, intent, data)) for position, (intent, data) in enumerate(requests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Caller stopped early - don't leave the remaining calls running unobserved
+            for task in tasks:
+                task.cancel()
+    
+    def execute_cached(self, intent: APIIntent, data: Dict[str, Any]) -> Optional[APIResponse]:
+        """Synchronous cache-only lookup - the cached response for a read, or None when execute() would call the API"""
+        # Agents overriding execute() manage their own caching, so only the base read path is served here
+        if intent not in _CACHEABLE_INTENTS or type(self).execute is not BaseAPIAgent.execute:
+            return None
+        if not self.validate_payload(intent, data)[0]:
+            return None
+        cached_response = self.get_cached_response(self.get_cache_key(intent, data))
+        if cached_response is not None:
+            cached_response.intent = intent.value
+        return cached_response
+    
+    @staticmethod
+    def _is_client_error(response: APIResponse) -> bool:
+        """4xx other than 429 - the request itself was wrong, so caching the failure would not help"""
+        status = response.status_code
+        return status is not None and 400 <= status < 500 and status != 429
\ No newline at end of file
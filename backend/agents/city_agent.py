@@ -2,10 +2,58 @@
 City Agent - Handles city-related API operations
 Purpose: Search, list, and manage city data
 """
-from typing import Dict, Any, List, Optional
-import json
-import urllib.parse
-from .base_agent import BaseAPIAgent, APIIntent, APIResponse
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
+import operator
+import re
+import time
+from .base_agent import BaseAPIAgent, APIIntent, APIResponse, json_dumps
+
+__all__ = ["CityAgent", "CityRecord"]
+
+# Query parameters that never change, encoded once at import
+_EMBEDDED_JSON = '{"district":1,"district.state":1}'
+_EMPTY_PROJECTION = "{}"
+
+# Local name index built from the last LIST - keyed on the first few lowercase characters, refreshed daily
+_LOCAL_INDEX_PREFIX = 4
+_LOCAL_INDEX_TTL = 86400
+
+@dataclass(slots=True, frozen=True)
+class CityRecord:
+    """A city from the LIST response - slotted, since the full list is fetched and kept around"""
+    id: str
+    name: str
+    state: str
+    district: str
+    
+    # Callers that predate the record read cities like dicts
+    def __getitem__(self, key: str) -> str:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+def _district_names(city: Dict[str, Any]) -> Tuple[str, str]:
+    """(state name, district name) from a city's embedded district, 'Unknown' where missing"""
+    district = city.get('district')
+    if not isinstance(district, dict):
+        return 'Unknown', 'Unknown'
+    state = district.get('state')
+    return (state.get('name', 'Unknown') if isinstance(state, dict) else 'Unknown'), district.get('name', 'Unknown')
+
+def _project_city(city: Dict[str, Any]) -> CityRecord:
+    """Keep only the id, name, state and district of a city record from the LIST response"""
+    state_name, district_name = _district_names(city)
+    return CityRecord(
+        id=city.get('_id', ''),
+        name=city.get('name', ''),
+        state=state_name,
+        district=district_name
+    )
 
 class CityAgent(BaseAPIAgent):
     """
@@ -19,11 +67,31 @@ class CityAgent(BaseAPIAgent):
     
     def __init__(self, base_url: str, auth_config: Dict[str, str]):
         super().__init__(name="CityAgent", base_url=base_url, auth_config=auth_config)
-        self.rate_limit_delay = 5.0  # 5 seconds as per original code
+        # 10 requests a second with a burst of 10 - the shared limiter backs off by itself if the API returns 429
+        self.rate_limit_delay = 0.1
+        self.rate_limit_burst = 10
+        # City records rarely change - keep lookups for an hour so hot names skip the request entirely
+        self.cache_ttl = 3600
+        self.cache_max = 1000
+        # name prefix -> [(lowercase name, city id)], so known names resolve without a request
+        self._local_index: Dict[str, List[Tuple[str, str]]] = {}
+        self._local_index_expires = 0.0
+        # intent -> handler taking the request data, so handle_intent is one dict lookup
+        self._intent_dispatch = {
+            APIIntent.LIST: lambda data: self._list_all_cities(),
+            APIIntent.SEARCH: lambda data: self._search_city_by_name(data["city_name"]),
+            APIIntent.READ: lambda data: self._get_city_by_id(data["city_id"])
+        }
         
     def get_supported_intents(self) -> List[APIIntent]:
         return [APIIntent.LIST, APIIntent.SEARCH, APIIntent.READ]
     
+    def get_cache_key(self, intent: APIIntent, data: Dict[str, Any]) -> str:
+        """Searches differing only in case or surrounding whitespace share one cache entry and one in-flight call"""
+        if intent == APIIntent.SEARCH:
+            data = {"city_name": data["city_name"].strip().lower()}
+        return super().get_cache_key(intent, data)
+    
     def validate_payload(self, intent: APIIntent, data: Dict[str, Any]) -> tuple[bool, Optional[str]]:
         """Validate payload for city operations"""
         if intent == APIIntent.SEARCH:
@@ -39,75 +107,71 @@ class CityAgent(BaseAPIAgent):
     
     async def handle_intent(self, intent: APIIntent, data: Dict[str, Any]) -> APIResponse:
         """Handle city-specific intents"""
-        
-        if intent == APIIntent.LIST:
-            return await self._list_all_cities()
-        elif intent == APIIntent.SEARCH:
-            return await self._search_city_by_name(data["city_name"])
-        elif intent == APIIntent.READ:
-            return await self._get_city_by_id(data["city_id"])
-        else:
+        handler = self._intent_dispatch.get(intent)
+        if handler is None:
             return APIResponse(
                 success=False,
                 error=f"Intent {intent.value} not implemented",
                 agent_name=self.name
             )
+        return await handler(data)
     
     async def _list_all_cities(self) -> APIResponse:
         """Get all cities from API with embedded district/state data"""
         params = {
             "max_results": "1000",
-            "embedded": json.dumps({
-                "district": 1,
-                "district.state": 1
-            })
+            "embedded": _EMBEDDED_JSON
         }
         
-        response = await self._make_request("GET", "", params=params)
+        # Each city is reduced to the fields we keep as it is parsed - the embedded district/state records are dropped
+        response = await self._make_request("GET", "", params=params, item_transform=_project_city)
         
         if response.success and response.data:
-            cities_data = response.data
-            processed_cities = []
-            
-            if isinstance(cities_data, dict) and "_items" in cities_data:
-                items = cities_data["_items"]
-                for city in items:
-                    processed_cities.append({
-                        "id": city.get('_id', ''),
-                        "name": city.get('name', ''),
-                        "state": city.get('district', {}).get('state', {}).get('name', 'Unknown') if isinstance(city.get('district'), dict) else 'Unknown',
-                        "district": city.get('district', {}).get('name', 'Unknown') if isinstance(city.get('district'), dict) else 'Unknown'
-                    })
-                
-                response.data = {
-                    "cities": processed_cities,
-                    "total_count": len(processed_cities)
-                }
+            processed_cities = response.data["_items"]
+            response.data = {
+                "cities": processed_cities,
+                "total_count": len(processed_cities)
+            }
+            self._build_local_index(processed_cities)
         
         return response
     
+    def _build_local_index(self, cities: List[CityRecord]):
+        """Index LIST cities by name prefix; sorted by name so duplicates resolve the same way SEARCH does"""
+        index: Dict[str, List[Tuple[str, str]]] = {}
+        for city in sorted(cities, key=operator.attrgetter("name")):
+            name = city.name.strip().lower()
+            if name and city.id:
+                index.setdefault(name[:_LOCAL_INDEX_PREFIX], []).append((name, city.id))
+        self._local_index = index
+        self._local_index_expires = time.monotonic() + _LOCAL_INDEX_TTL
+    
+    def _lookup_local_index(self, city_name: str) -> Optional[str]:
+        """City ID for an exact (case-insensitive) name from the local index, or None if unknown or stale"""
+        if time.monotonic() >= self._local_index_expires:
+            return None
+        name = city_name.strip().lower()
+        for indexed_name, city_id in self._local_index.get(name[:_LOCAL_INDEX_PREFIX], ()):
+            if indexed_name == name:
+                return city_id
+        return None
+    
     async def _search_city_by_name(self, city_name: str) -> APIResponse:
         """Search for cities by name using MongoDB regex query"""
         city_name_clean = city_name.strip().lower()
         
         # Create MongoDB regex query for case-insensitive search starting with city name
-        where_query = {
-            "name": {
-                "$regex": f"^{city_name_clean}",
-                "$options": "i"
-            }
-        }
-        
-        embedded_query = {
-            "district": 1,
-            "district.state": 1
-        }
+        # The input is escaped so metacharacters can't turn the bare ^ prefix into a scan-everything pattern;
+        # "i" stays because names are stored mixed-case and there is no lowercased name field to match against.
+        # Only the name varies, so it is JSON-escaped and dropped into the fixed template
+        pattern = json_dumps(f"^{re.escape(city_name_clean)}")
+        where_query = f'{{"name":{{"$regex":{pattern},"$options":"i"}}}}'
         
         # URL encode the parameters as shown in the API example
         params = {
-            "where": json.dumps(where_query),
-            "embedded": json.dumps(embedded_query),
-            "projection": json.dumps({})
+            "where": where_query,
+            "embedded": _EMBEDDED_JSON,
+            "projection": _EMPTY_PROJECTION
         }
         
         response = await self._make_request("GET", "", params=params)
@@ -118,6 +182,8 @@ class CityAgent(BaseAPIAgent):
             
             if isinstance(cities_data, dict) and "_items" in cities_data:
                 items = cities_data["_items"]
+                exact_matches = []
+                partial_matches = []
                 
                 # Process all matching cities from regex search
                 for city in items:
@@ -125,23 +191,25 @@ class CityAgent(BaseAPIAgent):
                     city_id_from_api = city.get('_id', '')
                     
                     if city_name_from_api and city_id_from_api:
-                        # Check if it's an exact match
-                        is_exact_match = city_name_from_api.lower() == city_name_clean
+                        # Check if it's an exact match - names already in lowercase skip the copy
+                        name_lower = city_name_from_api if city_name_from_api.islower() else city_name_from_api.lower()
+                        is_exact_match = name_lower == city_name_clean
                         
-                        processed_cities.append({
+                        state_name, district_name = _district_names(city)
+                        
+                        (exact_matches if is_exact_match else partial_matches).append({
                             "id": city_id_from_api,
                             "name": city_name_from_api,
                             "matched": is_exact_match,
-                            "state": self._extract_state_name(city),
-                            "district": self._extract_district_name(city)
+                            "state": state_name,
+                            "district": district_name
                         })
                 
-                # Sort by exact match first, then alphabetically
-                processed_cities.sort(key=lambda x: (not x["matched"], x["name"]))
-                
-                # Check if we have exact matches
-                exact_matches = [city for city in processed_cities if city.get("matched", False)]
-                partial_matches = [city for city in processed_cities if not city.get("matched", False)]
+                # Exact matches first, then alphabetically - partitioned as built, so each side is just sorted by name
+                by_name = operator.itemgetter("name")
+                exact_matches.sort(key=by_name)
+                partial_matches.sort(key=by_name)
+                processed_cities = exact_matches + partial_matches
                 
                 if exact_matches:
                     # Exact match found
@@ -189,38 +257,21 @@ class CityAgent(BaseAPIAgent):
         """Get specific city by ID"""
         return await self._make_request("GET", f"/{city_id}")
     
-    def _extract_state_name(self, city_data: Dict[str, Any]) -> str:
-        """Extract state name from city data"""
-        try:
-            district = city_data.get('district', {})
-            if isinstance(district, dict):
-                state = district.get('state', {})
-                if isinstance(state, dict):
-                    return state.get('name', 'Unknown')
-            return 'Unknown'
-        except Exception:
-            return 'Unknown'
-    
-    def _extract_district_name(self, city_data: Dict[str, Any]) -> str:
-        """Extract district name from city data"""
-        try:
-            district = city_data.get('district', {})
-            if isinstance(district, dict):
-                return district.get('name', 'Unknown')
-            return 'Unknown'
-        except Exception:
-            return 'Unknown'
-    
     def extract_city_mapping(self, response_data: Dict[str, Any]) -> Dict[str, str]:
         """Extract name -> id mapping from API response"""
-        mapping = {}
+        # Names and ids are collected side by side and zipped into the dict in one call
+        names: List[str] = []
+        ids: List[str] = []
+        add_name = names.append
+        add_id = ids.append
         
         if isinstance(response_data, list):
             for city in response_data:
                 city_name = city.get('name', '').strip()
                 city_id = city.get('id') or city.get('_id', '')
                 if city_name and city_id:
-                    mapping[city_name.lower().strip()] = str(city_id)
+                    add_name(city_name.lower())
+                    add_id(str(city_id))
         
         elif isinstance(response_data, dict):
             if "_items" in response_data:
@@ -228,19 +279,26 @@ class CityAgent(BaseAPIAgent):
                     city_name = city.get('name', '').strip()
                     city_id = city.get('_id') or city.get('id', '')
                     if city_name and city_id:
-                        mapping[city_name.lower().strip()] = str(city_id)
+                        add_name(city_name.lower())
+                        add_id(str(city_id))
             else:
                 for key, value in response_data.items():
                     if isinstance(value, dict):
                         city_name = value.get('name') or key
                         city_id = value.get('id') or value.get('_id', key)
                         if city_name and city_id:
-                            mapping[city_name.lower().strip()] = str(city_id)
+                            add_name(city_name.lower().strip())
+                            add_id(str(city_id))
         
-        return mapping
+        return dict(zip(names, ids))
     
     async def get_city_id_by_name(self, city_name: str) -> Optional[str]:
         """Convenience method to get city ID by name with exact match priority"""
+        # Names seen in a recent LIST resolve locally, skipping the request and its rate-limit slot
+        city_id = self._lookup_local_index(city_name)
+        if city_id is not None:
+            return city_id
+        
         response = await self.execute(APIIntent.SEARCH, {"city_name": city_name})
         
         if response.success and response.data:
@@ -3,9 +3,14 @@
 ConsignerConsigneeAgent - Enhanced agent for handling both consigner and consignee selection
 Supports shared partner lists, data storage, and API integration
 """
+import copy
 import json
 from typing import Dict, List, Any, Optional
-from .base_agent import BaseAPIAgent, APIIntent, APIResponse
+from .base_agent import BaseAPIAgent, APIIntent, APIResponse, json_dumps
+from .consignor_selection_agent import PARTNER_EMBEDDED_QUERY_JSON
+
+# Partner pages are re-requested on every selection and page change; keep them briefly
+_PARTNERS_CACHE_TTL = 60
 
 class ConsignerConsigneeAgent(BaseAPIAgent):
     """Enhanced agent for selecting both consigners and consignees with shared data"""
@@ -33,6 +38,7 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
             "parcel_etag": None,  # Store _etag from parcel creation
             "user_context": {}
         }
+        self.cache_max = 128  # Partner pages keyed by (company, page, page size)
     
     async def execute(self, intent: APIIntent, data: Dict[str, Any]) -> APIResponse:
         """Execute consigner/consignee selection based on intent"""
@@ -122,12 +128,12 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
             page = data.get("page", 0)
             page_size = data.get("page_size", 5)
             
-            # Build embedded query for partner details
-            embedded_query = {
-                "user_preferred_partner": 1,
-                "user_preferred_partner.postal_addresses.city": 1,
-                "company_preferred_partner": 1
-            }
+            # Callers keep and modify the partner lists, so the cache hands out copies
+            cache_key = self.get_cache_key(APIIntent.SEARCH, {"company_id": company_id, "page": page, "page_size": page_size})
+            cached_response = self.get_cached_response(cache_key)
+            if cached_response:
+                print(f"ConsignerConsigneeAgent: Using cached partners for company_id: {company_id}, page: {page}")
+                return copy.deepcopy(cached_response)
             
             # Build where query for company filter
             where_query = {
@@ -136,8 +142,8 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
             
             # Build request parameters
             params = {
-                "embedded": json.dumps(embedded_query),
-                "where": json.dumps(where_query),
+                "embedded": PARTNER_EMBEDDED_QUERY_JSON,
+                "where": json_dumps(where_query),
                 "max_results": str(page_size + 10),
                 "skip": str(page * page_size)
             }
@@ -168,7 +174,7 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
 
             if not items:
                 print(f"ConsignerConsigneeAgent: No preferred partners found for company {company_id}")
-                return APIResponse(
+                return self._cache_partners(cache_key, APIResponse(
                     success=True,
                     data={
                         "partners": [],
@@ -177,7 +183,7 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
                         "page": page
                     },
                     agent_name=self.name
-                )
+                ))
             
             # Process partners for display
             partners = []
@@ -193,7 +199,7 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
 
             print(f"ConsignerConsigneeAgent: Processed {len(partners)} valid partners for display")
 
-            return APIResponse(
+            return self._cache_partners(cache_key, APIResponse(
                 success=True,
                 data={
                     "partners": partners,
@@ -203,7 +209,7 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
                     "total_available": len(items)
                 },
                 agent_name=self.name
-            )
+            ))
             
         except Exception as e:
             print(f"ConsignerConsigneeAgent: EXCEPTION in _get_preferred_partners: {str(e)}")
@@ -215,6 +221,11 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
                 agent_name=self.name
             )
     
+    def _cache_partners(self, cache_key: str, response: APIResponse) -> APIResponse:
+        """Cache a private copy of a partner page and return the original to the caller"""
+        self.cache_response(cache_key, copy.deepcopy(response), _PARTNERS_CACHE_TTL)
+        return response
+    
     def _extract_partner_info(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Extract partner information for display"""
         try:
@@ -492,50 +503,59 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
         consigner = self.selection_data["consigner"]
         consignee = self.selection_data["consignee"]
         
-        message = "🎉 **Selection Complete!**\n\n"
-        message += "**CONSIGNER DETAILS:**\n"
-        message += f"• Name: {consigner['name']}\n"
-        message += f"• Location: {consigner['city']}\n"
-        message += f"• ID: {consigner['id']}\n\n"
-        
-        message += "**CONSIGNEE DETAILS:**\n"
-        message += f"• Name: {consignee['name']}\n"
-        message += f"• Location: {consignee['city']}\n"
-        message += f"• ID: {consignee['id']}\n\n"
+        parts = [
+            "🎉 **Selection Complete!**\n\n",
+            "**CONSIGNER DETAILS:**\n",
+            f"• Name: {consigner['name']}\n",
+            f"• Location: {consigner['city']}\n",
+            f"• ID: {consigner['id']}\n\n",
+            "**CONSIGNEE DETAILS:**\n",
+            f"• Name: {consignee['name']}\n",
+            f"• Location: {consignee['city']}\n",
+            f"• ID: {consignee['id']}\n\n"
+        ]
         
         if self.selection_data["trip_id"]:
-            message += f"🚛 **Trip ID:** {self.selection_data['trip_id']}\n"
+            parts.append(f"🚛 **Trip ID:** {self.selection_data['trip_id']}\n")
         if self.selection_data["parcel_id"]:
-            message += f"📦 **Parcel ID:** {self.selection_data['parcel_id']}\n"
+            parts.append(f"📦 **Parcel ID:** {self.selection_data['parcel_id']}\n")
         
-        message += "\n✅ All information is ready for API submission!"
+        parts.append("\n✅ All information is ready for API submission!")
         
-        return message
+        return "".join(parts)
+    
+    @staticmethod
+    def _append_partner_lines(parts: List[str], partners: List[Dict[str, Any]], consigner_id: Optional[str] = None):
+        """Append the numbered partner list, marking the partner whose id is consigner_id"""
+        append = parts.append
+        for i, partner in enumerate(partners, 1):
+            if consigner_id is not None and partner['id'] == consigner_id:
+                append(f"🔵 `{i}. {partner['name']}` *(Same as Consigner)*\n")
+            else:
+                append(f"🔵 `{i}. {partner['name']}`\n")
+            append(f"   📍 {partner['city']}")
+            if partner.get('company_info'):
+                append(f" • {partner['company_info']}")
+            append("\n\n")
     
     def format_consigner_selection_message(self, partners: List[Dict[str, Any]], page: int = 0) -> str:
         """Format message specifically for consigner selection"""
         if not partners:
             return "No preferred partners available for consigner selection."
         
-        message = "📋 **STEP 1: Select a CONSIGNER (Sender)**\n\n"
-        message += "Choose who will be sending the parcel:\n\n"
+        parts = [
+            "📋 **STEP 1: Select a CONSIGNER (Sender)**\n\n",
+            "Choose who will be sending the parcel:\n\n"
+        ]
         
         # Show available partners
-        for i, partner in enumerate(partners, 1):
-            partner_name = partner['name']
-            city = partner['city'] if partner['city'] != 'Unknown City' else 'Unknown City'
-            
-            message += f"🔵 `{i}. {partner_name}`\n"
-            message += f"   📍 {city}"
-            if partner.get('company_info'):
-                message += f" • {partner['company_info']}"
-            message += "\n\n"
+        self._append_partner_lines(parts, partners)
         
         # Action buttons
-        message += f"🔵 `Show More Partners`     🔵 `Skip Selection`\n\n"
-        message += "💡 **Click on any partner number to select them as CONSIGNER.**"
+        parts.append("🔵 `Show More Partners`     🔵 `Skip Selection`\n\n")
+        parts.append("💡 **Click on any partner number to select them as CONSIGNER.**")
         
-        return message
+        return "".join(parts)
     
     def format_consignee_selection_message(self, selected_consigner: Dict[str, Any],
                                          partners: List[Dict[str, Any]], page: int = 0) -> str:
@@ -543,32 +563,21 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
         if not partners:
             return f"✅ Consigner selected: {selected_consigner['name']}\n\nNo partners available for consignee selection."
 
-        message = f"✅ **CONSIGNER STORED IN BACKEND:** {selected_consigner['name']} ({selected_consigner['city']})\n\n"
-        message += "📋 **STEP 2: Select a CONSIGNEE (Receiver)**\n\n"
-        message += "**Using same Preferred Partners API:** `/preferred_partners`\n"
-        message += "Choose who will be receiving the parcel:\n\n"
+        parts = [
+            f"✅ **CONSIGNER STORED IN BACKEND:** {selected_consigner['name']} ({selected_consigner['city']})\n\n",
+            "📋 **STEP 2: Select a CONSIGNEE (Receiver)**\n\n",
+            "**Using same Preferred Partners API:** `/preferred_partners`\n",
+            "Choose who will be receiving the parcel:\n\n"
+        ]
         
-        # Show available partners (same list, but different purpose)
-        for i, partner in enumerate(partners, 1):
-            partner_name = partner['name']
-            city = partner['city'] if partner['city'] != 'Unknown City' else 'Unknown City'
-            
-            # Highlight if it's the same as consigner
-            if partner['id'] == selected_consigner['id']:
-                message += f"🔵 `{i}. {partner_name}` *(Same as Consigner)*\n"
-            else:
-                message += f"🔵 `{i}. {partner_name}`\n"
-            
-            message += f"   📍 {city}"
-            if partner.get('company_info'):
-                message += f" • {partner['company_info']}"
-            message += "\n\n"
+        # Show available partners (same list, but different purpose), highlighting the consigner
+        self._append_partner_lines(parts, partners, selected_consigner['id'])
         
         # Action buttons
-        message += f"🔵 `Show More Partners`     🔵 `Skip Selection`\n\n"
-        message += "💡 **Click on any partner number to select them as CONSIGNEE.**"
+        parts.append("🔵 `Show More Partners`     🔵 `Skip Selection`\n\n")
+        parts.append("💡 **Click on any partner number to select them as CONSIGNEE.**")
         
-        return message
+        return "".join(parts)
 
     def format_partners_for_display(self, partners: List[Dict[str, Any]], 
                                   selection_type: str, page: int = 0) -> str:
@@ -577,29 +586,21 @@ class ConsignerConsigneeAgent(BaseAPIAgent):
             return f"No preferred partners available for {selection_type} selection."
         
         current_step = selection_type.title()
-        message = f"**Select a {current_step}:**\n\n"
+        parts = [f"**Select a {current_step}:**\n\n"]
         
         # Show current selection status
         if self.selection_data["consigner"]:
             consigner = self.selection_data["consigner"]
-            message += f"✅ **Consigner:** {consigner['name']} ({consigner['city']})\n\n"
+            parts.append(f"✅ **Consigner:** {consigner['name']} ({consigner['city']})\n\n")
         
         # Show available partners
-        for i, partner in enumerate(partners, 1):
-            partner_name = partner['name']
-            city = partner['city'] if partner['city'] != 'Unknown City' else 'Unknown City'
-            
-            message += f"🔵 `{i}. {partner_name}`\n"
-            message += f"   📍 {city}"
-            if partner.get('company_info'):
-                message += f" • {partner['company_info']}"
-            message += "\n\n"
+        self._append_partner_lines(parts, partners)
         
         # Action buttons
-        message += f"🔵 `Show More Partners`     🔵 `Skip Selection`\n\n"
-        message += f"💡 **Click on any partner number to select them as {selection_type}.**"
+        parts.append("🔵 `Show More Partners`     🔵 `Skip Selection`\n\n")
+        parts.append(f"💡 **Click on any partner number to select them as {selection_type}.**")
         
-        return message
+        return "".join(parts)
     
     def format_partners_as_buttons(self, partners: List[Dict[str, Any]], 
                                  selection_type: str, page: int = 0) -> Dict[str, Any]:
@@ -3,9 +3,16 @@
 ConsignorSelectionAgent - Handles selection of consignors from preferred partners
 Triggers after successful parcel creation to show available preferred partners
 """
-import json
 from typing import Dict, List, Any, Optional
-from .base_agent import BaseAPIAgent, APIIntent, APIResponse
+from .base_agent import BaseAPIAgent, APIIntent, APIResponse, json_dumps
+
+# Partner details embedded in every preferred_partners request - encoded once at import
+# (shared with ConsignerConsigneeAgent, which queries the same endpoint)
+PARTNER_EMBEDDED_QUERY_JSON = json_dumps({
+    "user_preferred_partner": 1,
+    "user_preferred_partner.postal_addresses.city": 1,
+    "company_preferred_partner": 1
+})
 
 class ConsignorSelectionAgent(BaseAPIAgent):
     """Agent for selecting consignors from preferred partners API"""
@@ -49,13 +56,6 @@ class ConsignorSelectionAgent(BaseAPIAgent):
             page = data.get("page", 0)
             page_size = data.get("page_size", 5)
             
-            # Build embedded query for partner details
-            embedded_query = {
-                "user_preferred_partner": 1,
-                "user_preferred_partner.postal_addresses.city": 1,
-                "company_preferred_partner": 1
-            }
-            
             # Build where query for company filter
             where_query = {
                 "user_company": company_id
@@ -63,16 +63,16 @@ class ConsignorSelectionAgent(BaseAPIAgent):
             
             # Build request parameters
             params = {
-                "embedded": json.dumps(embedded_query),
-                "where": json.dumps(where_query),
+                "embedded": PARTNER_EMBEDDED_QUERY_JSON,
+                "where": json_dumps(where_query),
                 "max_results": str(page_size + 10),  # Get extra for pagination
                 "skip": str(page * page_size)
             }
             
             print(f"ConsignorSelectionAgent: Searching for company_id: {company_id}")
             print(f"ConsignorSelectionAgent: API URL: {self.base_url}")
-            print(f"ConsignorSelectionAgent: embedded query: {json.dumps(embedded_query)}")
-            print(f"ConsignorSelectionAgent: where query: {json.dumps(where_query)}")
+            print(f"ConsignorSelectionAgent: embedded query: {params['embedded']}")
+            print(f"ConsignorSelectionAgent: where query: {params['where']}")
             
             response = await self._make_request("GET", "", params=params)
             
@@ -4,13 +4,10 @@ Demonstrates how to use the specialized agents for different API operations
 """
 import asyncio
 import json
-from dotenv import load_dotenv
 
 from agent_manager import agent_manager, WorkflowIntent
 from base_agent import APIIntent
 
-load_dotenv()
-
 async def example_city_operations():
     """Example: City-related operations"""
     print("\n🏙️  CITY OPERATIONS EXAMPLES")
@@ -37,6 +34,18 @@ async def example_city_operations():
     print(f"   Success: {response.success}")
     if response.success:
         print(f"   Execution time: {response.execution_time:.2f}s")
+    
+    # Search several cities at once, printing each result as soon as it arrives
+    print("\n3. Searching several cities concurrently:")
+    city_names = ["Jaipur", "Delhi", "Mumbai"]
+    city_agent = agent_manager.get_agent("city")
+    if city_agent is None:
+        print("   City agent not configured")
+        return
+    searches = [(APIIntent.SEARCH, {"city_name": name}) for name in city_names]
+    async for position, response in city_agent.execute_many(searches):
+        found = len(response.data.get("cities", [])) if response.success and response.data else 0
+        print(f"   {city_names[position]}: success={response.success}, {found} match(es)")
 
 async def example_material_operations():
     """Example: Material-related operations"""
@@ -92,7 +101,8 @@ async def example_parcel_workflow():
         "pickup_address": "Industrial Area, Jaipur",
         "delivery_address": "Salt Lake, Kolkata",
         "pickup_pin": "302013",
-        "delivery_pin": "700091"
+        "delivery_pin": "700091",
+        "_trace": True  # record the workflow steps printed below
     }
     
     print("Creating parcel with automatic dependency resolution:")
@@ -147,7 +157,8 @@ async def example_dependency_resolution():
     test_data = {
         "from_city": "Mumbai",
         "to_city": "Delhi",
-        "material": "steel"
+        "material": "steel",
+        "_trace": True  # record the resolution steps printed below
     }
     
     print("Resolving dependencies for:")
@@ -3,9 +3,7 @@ Parcel Agent - Handles parcel-related API operations
 Purpose: Create, search, update, and manage parcel data
 """
 from typing import Dict, Any, List, Optional
-import json
-import urllib.parse
-from .base_agent import BaseAPIAgent, APIIntent, APIResponse
+from .base_agent import BaseAPIAgent, APIIntent, APIResponse, json_dumps
 
 class ParcelAgent(BaseAPIAgent):
     """
@@ -161,8 +159,8 @@ class ParcelAgent(BaseAPIAgent):
             where_conditions["unload_postal_address.city"] = data["to_city"]
         
         if where_conditions:
-            where_param = urllib.parse.quote(json.dumps(where_conditions))
-            params = {"where": where_param}
+            # Raw JSON - the HTTP client percent-encodes params itself
+            params = {"where": json_dumps(where_conditions)}
         else:
             params = {}
         
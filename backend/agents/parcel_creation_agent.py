@@ -4,11 +4,9 @@ import json
 import asyncio
 import os
 import logging
-from dotenv import load_dotenv
 from .base_agent import BaseAPIAgent, APIResponse, APIIntent
 from pydantic import BaseModel
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
 class AddressModel(BaseModel):
@@ -3,9 +3,7 @@ Trip Agent - Handles trip-related API operations
 Purpose: Create, search, and manage trip data
 """
 from typing import Dict, Any, List, Optional
-import json
-import urllib.parse
-from .base_agent import BaseAPIAgent, APIIntent, APIResponse
+from .base_agent import BaseAPIAgent, APIIntent, APIResponse, json_dumps
 
 class TripAgent(BaseAPIAgent):
     """
@@ -120,7 +118,8 @@ class TripAgent(BaseAPIAgent):
                 "pickup_postal_address.city": data["from_city_id"],
                 "unload_postal_address.city": data["to_city_id"]
             }
-            params["where"] = urllib.parse.quote(json.dumps(where_query))
+            # Raw JSON - the HTTP client percent-encodes params itself
+            params["where"] = json_dumps(where_query)
         elif "route" in data:
             # Generic route search
             params["search"] = data["route"]
@@ -343,7 +343,7 @@ If something cannot be identified, set the field to null but keep the structure.
             from agents.city_agent import CityAgent
             
             # Get the city agent from agent manager
-            city_agent = agent_manager.agents.get("city")
+            city_agent = agent_manager.get_agent("city")
             if not city_agent or not isinstance(city_agent, CityAgent):
                 return {
                     "success": False,
@@ -4,6 +4,7 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import base64
+import asyncio
 from auth import (
     authenticate_user, create_access_token, verify_token, get_user,
     ACCESS_TOKEN_EXPIRE_MINUTES, Token, User
@@ -22,6 +23,25 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "User-Agent"],
 )
 
+@app.on_event("startup")
+async def warm_agent_clients():
+    """Pre-open the partner API connection in the background"""
+    # Held on app.state - the event loop only keeps weak references to tasks
+    app.state.warm_up_task = asyncio.create_task(agent_manager.warm_up())
+
+@app.on_event("shutdown")
+async def close_agent_clients():
+    """Stop a still-running warm-up, then release pooled HTTP connections held by the agent manager"""
+    warm_up_task = app.state.warm_up_task
+    warm_up_task.cancel()
+    try:
+        await warm_up_task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        print(f"Agent warm-up failed: {e}")
+    await agent_manager.aclose()
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 class LoginRequest(BaseModel):
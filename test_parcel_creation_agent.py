@@ -73,7 +73,7 @@ async def test_parcel_creation_agent_directly():
     print("\n=== Step 3: Testing ParcelCreationAgent Directly ===")
     
     try:
-        parcel_creator = agent_manager.agents.get("parcel_creator")
+        parcel_creator = agent_manager.get_agent("parcel_creator")
         if not parcel_creator:
             print("ERROR: ParcelCreationAgent not available")
             return